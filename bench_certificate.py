@@ -0,0 +1,131 @@
+"""여러 대 확인서 생성 시간·메모리 측정.
+
+연소기 50 / 100 / 250 / 500 대짜리 확인서를 PDF·DOCX 로 만들어 시간과 최대 메모리를 재고,
+행 수에 비례해 늘어나는지(두 배 행 → 대략 두 배 이내) 확인합니다.
+500 대 확인서가 한도를 넘으면 0 이 아닌 값으로 끝납니다.
+
+메모리는 측정마다 새 프로세스에서 재는 최대 RSS 증가량(peak RSS − 생성 직전 RSS)입니다.
+python-docx 의 lxml(libxml2) 할당은 tracemalloc 에 보이지 않으므로 RSS 를 사용합니다.
+Linux 에서는 /proc/self/clear_refs 로 최대 RSS 를 초기화해 VmHWM 을 읽고, 그 밖에서는 ru_maxrss 를 씁니다.
+둘 다 없는 플랫폼(Windows)에서는 시간만 재고 메모리 항목은 "-" 로 표시합니다.
+
+    python bench_certificate.py
+    python bench_certificate.py --rows 50 100 250 500 1000 --max-seconds 20 --max-mb 256
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+from datetime import date
+
+from certificate import make_docx, make_pdf
+
+SCALE_SLACK = 1.5     # 행 수 비율 대비 허용 배율 (조판 고정 비용이 있어 보통 비율보다 작음)
+NOISE_MB = 2.0        # 이보다 작은 메모리 증가량은 배율 비교에서 이 값으로 봄 (할당자 잡음)
+FORMATS = {"pdf": lambda info: make_pdf(info), "docx": lambda info: make_docx(info, None)}
+
+
+def sample_info(rows: int) -> dict:
+    units = [
+        {"번호": f"NO.{i}", "연소기명": f"NCB354-{15 + i % 4 * 3}K (LNG, FF)", "수량": 1 + i % 3}
+        for i in range(1, rows + 1)
+    ]
+    return dict(
+        번호="NO.1", 연소기명=units[0]["연소기명"], 수량=units[0]["수량"], 변경일=date.today(),
+        작업자_소속="OO설비", 작업자_성명="홍길동", 작업자격="가스시설시공관리자",
+        시공업체="OO설비", 시공관리자="김철수", units=units,
+    )
+
+
+def _proc_kb(field: str) -> int | None:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _maxrss_kb() -> int | None:
+    try:
+        import resource      # Unix 전용
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def _child(fmt: str, rows: int):
+    """새 프로세스에서 한 번 생성하고 {"seconds", "peak_mb", "size"} 를 출력."""
+    render = FORMATS[fmt]
+    render(sample_info(1))       # 글꼴 등록·템플릿 생성은 측정에서 제외
+    info = sample_info(rows)
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")         # VmHWM 을 현재 RSS 로 초기화
+        before, peak_field = _proc_kb("VmRSS"), "VmHWM"
+    except OSError:
+        before, peak_field = _maxrss_kb(), None
+    start = time.perf_counter()
+    out = render(info)
+    elapsed = time.perf_counter() - start
+    peak = _proc_kb(peak_field) if peak_field else _maxrss_kb()
+    peak_mb = None if peak is None or before is None else max(0, peak - before) / 1024
+    print(json.dumps({"seconds": elapsed, "peak_mb": peak_mb, "size": len(out.getvalue())}))
+
+
+def measure(fmt: str, rows: int) -> tuple[float, float | None, int]:
+    """(초, 최대 RSS 증가 MB 또는 None, 결과 크기 bytes) — 측정마다 새 프로세스."""
+    out = subprocess.run([sys.executable, __file__, "--child", fmt, str(rows)],
+                         capture_output=True, text=True, check=True)
+    r = json.loads(out.stdout.strip().splitlines()[-1])
+    return r["seconds"], r["peak_mb"], r["size"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="여러 대 확인서 생성 시간·메모리 측정")
+    parser.add_argument("--rows", type=int, nargs="+", default=[50, 100, 250, 500])
+    parser.add_argument("--max-seconds", type=float, default=15.0, help="가장 큰 확인서 한 부의 시간 한도")
+    parser.add_argument("--max-mb", type=float, default=128.0, help="가장 큰 확인서 한 부의 최대 RSS 증가 한도")
+    parser.add_argument("--child", nargs=2, metavar=("FORMAT", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _child(args.child[0], int(args.child[1]))
+        return
+
+    results = {}
+    print(f"{'rows':>6} {'format':>6} {'seconds':>9} {'RSS+ MB':>9} {'size KB':>9}   (RSS+ = 생성 중 최대 RSS 증가량)")
+    for rows in sorted(args.rows):
+        for fmt in FORMATS:
+            elapsed, peak, size = measure(fmt, rows)
+            results[rows, fmt] = (elapsed, peak)
+            peak_text = "-" if peak is None else f"{peak:.1f}"
+            print(f"{rows:>6} {fmt:>6} {elapsed:>9.3f} {peak_text:>9} {size / 1024:>9.1f}", flush=True)
+
+    failures = []
+    rows = sorted(args.rows)
+    for fmt in ("pdf", "docx"):
+        for small, large in zip(rows, rows[1:]):
+            ratio = large / small
+            for i, what, floor in ((0, "시간", 1e-9), (1, "RSS", NOISE_MB)):
+                if results[large, fmt][i] is None or results[small, fmt][i] is None:
+                    continue         # 메모리를 잴 수 없는 플랫폼
+                grew = max(results[large, fmt][i], floor) / max(results[small, fmt][i], floor)
+                if grew > ratio * SCALE_SLACK:
+                    failures.append(f"{fmt} {small}→{large}대: {what} {grew:.1f}배 (행 수 {ratio:.1f}배)")
+        elapsed, peak = results[rows[-1], fmt]
+        if elapsed > args.max_seconds:
+            failures.append(f"{fmt} {rows[-1]}대: {elapsed:.1f}초 > {args.max_seconds}초")
+        if peak is not None and peak > args.max_mb:
+            failures.append(f"{fmt} {rows[-1]}대: {peak:.0f}MB > {args.max_mb}MB")
+
+    for f in failures:
+        print(f"FAIL {f}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
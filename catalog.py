@@ -0,0 +1,249 @@
+"""경동나비엔 가스보일러 급배기전환 모델 카탈로그.
+
+yoom_test.py (Streamlit 앱) 와 generate_qr.py (QR 라벨 일괄 생성) 가 함께 사용합니다.
+"""
+from urllib.parse import urlencode
+
+# ────────────────────────────────────────────────
+# 1) 데이터 (질문에서 주신 전체 리스트 그대로)
+# ────────────────────────────────────────────────
+data = [
+    # ── 일반형 개방식 ──
+    {"구분": "일반형", "세부구분": "개방식", "모델명": "NGB513", "연료": "LNG", "급배기방식": "FF",
+     "용량": "13K, 16K, 20K, 25K, 30K, 35K", "비고": "대리점신축", "전환여부": "전환불가"},
+    {"구분": "일반형", "세부구분": "개방식", "모델명": "NGB513", "연료": "LPG", "급배기방식": "FF",
+     "용량": "13K, 16K, 20K, 25K, 30K, 35K", "비고": "대리점신축", "전환여부": "전환불가"},
+
+    {"구분": "일반형", "세부구분": "개방식", "모델명": "NGB553", "연료": "LNG", "급배기방식": "FF",
+     "용량": "13K, 16K, 20K, 25K, 30K, 35K", "비고": "대리점유통", "전환여부": "전환가능"},
+    {"구분": "일반형", "세부구분": "개방식", "모델명": "NGB553", "연료": "LNG", "급배기방식": "FE",
+     "용량": "13K, 16K, 20K, 25K, 30K, 35K", "비고": "대리점유통", "전환여부": "전환가능"},
+    {"구분": "일반형", "세부구분": "개방식", "모델명": "NGB553", "연료": "LPG", "급배기방식": "FF",
+     "용량": "13K, 16K", "비고": "대리점유통", "전환여부": "전환불가"},
+    {"구분": "일반형", "세부구분": "개방식", "모델명": "NGB553", "연료": "LPG", "급배기방식": "FF",
+     "용량": "20K, 25K, 30K, 35K", "비고": "대리점유통", "전환여부": "전환가능"},
+    {"구분": "일반형", "세부구분": "개방식", "모델명": "NGB553", "연료": "LPG", "급배기방식": "FE",
+     "용량": "20K, 25K, 30K, 35K", "비고": "대리점유통", "전환여부": "전환가능"},
+
+
+    # ── 콘덴싱 개방식 ──
+    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB311", "연료": "LNG", "급배기방식": "FF",
+     "용량": "15K, 18K, 22K, 27K, 33K, 36K", "비고": "특판(단종예정)", "전환여부": "전환불가"},
+    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB311", "연료": "LPG", "급배기방식": "FF",
+     "용량": "15K, 18K, 22K, 27K, 33K, 36K", "비고": "특판(단종예정)", "전환여부": "전환불가"},
+ 
+    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB314", "연료": "LNG", "급배기방식": "FF",
+     "용량": "15K, 18K, 22K, 27K, 33K", "비고": "특판", "전환여부": "전환불가"},
+    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB314", "연료": "LPG", "급배기방식": "FF",
+     "용량": "15K, 18K, 22K, 27K, 33K", "비고": "특판", "전환여부": "전환불가"},
+
+    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB324", "연료": "LNG", "급배기방식": "FF",
+     "용량": "15K, 18K, 22K, 27K, 33K", "비고": "대리점신축", "전환여부": "전환불가"},
+    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB324", "연료": "LPG", "급배기방식": "FF",
+     "용량": "15K, 18K, 22K, 27K, 33K", "비고": "대리점신축", "전환여부": "전환불가"},
+
+
+    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB354", "연료": "LNG", "급배기방식": "FF",
+     "용량": "15K, 18K, 22K, 27K, 33K", "비고": "대리점 유통", "전환여부": "전환가능"},
+    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB354", "연료": "LNG", "급배기방식": "FE",
+     "용량": "15K, 18K, 22K, 27K, 33K", "비고": "대리점 유통", "전환여부": "전환가능"},
+    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB354", "연료": "LPG", "급배기방식": "FF",
+     "용량": "15K, 18K, 22K, 27K, 33K", "비고": "대리점 유통", "전환여부": "전환가능"},
+    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB354", "연료": "LPG", "급배기방식": "FE",
+     "용량": "15K, 18K, 22K, 27K, 33K", "비고": "대리점 유통", "전환여부": "전환가능"},
+
+
+    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB384", "연료": "LNG", "급배기방식": "FF",
+     "용량": "18K, 22K, 27K, 33K", "비고": "수요개발", "전환여부": "전환불가"},
+
+
+
+    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB553", "연료": "LNG", "급배기방식": "FF",
+     "용량": "22K, 27K, 33K, 43K", "비고": "대리점유통", "전환여부": "전환불가"},
+    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB553", "연료": "LPG", "급배기방식": "FF",
+     "용량": "22K, 27K, 33K, 43K", "비고": "대리점유통", "전환여부": "전환불가"},
+
+
+
+    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB713", "연료": "LNG", "급배기방식": "FF",
+     "용량": "22K, 27K, 33K, 43K", "비고": "특판", "전환여부": "전환불가"},
+    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB713", "연료": "LPG", "급배기방식": "FF",
+     "용량": "22K, 27K, 33K, 43K", "비고": "특판", "전환여부": "전환불가"},
+
+
+    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB753", "연료": "LNG", "급배기방식": "FF",
+     "용량": "22K, 27K, 33K, 43K", "비고": "대리점유통", "전환여부": "전환불가"},
+    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB753", "연료": "LPG", "급배기방식": "FF",
+     "용량": "22K, 27K, 33K, 43K", "비고": "대리점유통", "전환여부": "전환불가"},
+
+
+
+    # ── 일반형 밀폐식 ──
+
+    {"구분": "일반형", "세부구분": "밀폐식", "모델명": "NGB553", "연료": "LNG", "급배기방식": "FF",
+     "용량": "13L, 16L", "비고": "대리점유통", "전환여부": "전환불가"},
+    {"구분": "일반형", "세부구분": "밀폐식", "모델명": "NGB553", "연료": "LNG", "급배기방식": "FF",
+     "용량": "20L, 25L, 30L, 35L", "비고": "대리점유통", "전환여부": "전환가능"},
+    {"구분": "일반형", "세부구분": "밀폐식", "모델명": "NGB553", "연료": "LNG", "급배기방식": "FE",
+     "용량": "20L, 25L, 30L, 35L", "비고": "대리점유통", "전환여부": "전환가능"},
+    {"구분": "일반형", "세부구분": "밀폐식", "모델명": "NGB553", "연료": "LPG", "급배기방식": "FF",
+     "용량": "13L, 16L, 20L, 25L, 30L, 35L", "비고": "대리점유통", "전환여부": "전환불가"},
+
+
+    # ── 콘덴싱 밀폐식 ──
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB311", "연료": "LNG", "급배기방식": "FF",
+     "용량": "18L, 22L, 27L, 33L, 36L, 43L", "비고": "특판(단종예정)", "전환여부": "전환불가"},
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB311", "연료": "LPG", "급배기방식": "FF",
+     "용량": "18L, 22L, 27L, 33L", "비고": "특판(단종예정)", "전환여부": "전환불가"},
+
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB314", "연료": "LNG", "급배기방식": "FF",
+     "용량": "18L, 22L, 27L, 33L", "비고": "특판", "전환여부": "전환불가"},
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB314", "연료": "LPG", "급배기방식": "FF",
+     "용량": "18L, 22L, 27L, 33L", "비고": "특판", "전환여부": "전환불가"},
+
+
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB354", "연료": "LNG", "급배기방식": "FF",
+     "용량": "15L, 18L, 22L, 27L, 33L", "비고": "대리점 유통", "전환여부": "전환가능"},
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB354", "연료": "LNG", "급배기방식": "FE",
+     "용량": "15L, 18L, 22L, 27L, 33L", "비고": "대리점 유통", "전환여부": "전환가능"},
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB354", "연료": "LPG", "급배기방식": "FF",
+     "용량": "15L, 18L, 22L, 27L, 33L", "비고": "대리점 유통", "전환여부": "전환불가"},
+
+
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB553", "연료": "LNG", "급배기방식": "FF",
+     "용량": "22L, 27L, 33L", "비고": "대리점유통", "전환여부": "전환불가"},
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB553", "연료": "LNG", "급배기방식": "FF",
+     "용량": "43L", "비고": "대리점유통", "전환여부": "전환가능"},
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB553", "연료": "LNG", "급배기방식": "FE",
+     "용량": "43L", "비고": "대리점유통", "전환여부": "전환가능"},
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB553", "연료": "LPG", "급배기방식": "FF",
+     "용량": "22L, 27L, 33L, 43L", "비고": "대리점유통", "전환여부": "전환불가"},
+
+
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB713", "연료": "LNG", "급배기방식": "FF",
+     "용량": "22L, 27L, 33L, 43L", "비고": "특판", "전환여부": "전환불가"},
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB713", "연료": "LPG", "급배기방식": "FF",
+     "용량": "22L, 27L, 33L, 43L", "비고": "특판", "전환여부": "전환불가"},
+
+
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB753", "연료": "LNG", "급배기방식": "FF",
+     "용량": "22L, 27L, 33L", "비고": "대리점유통", "전환여부": "전환불가"},
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB753", "연료": "LNG", "급배기방식": "FF",
+     "용량": "43L", "비고": "대리점유통", "전환여부": "전환가능"},
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB753", "연료": "LNG", "급배기방식": "FE",
+     "용량": "43L", "비고": "대리점유통", "전환여부": "전환가능"},
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB753", "연료": "LPG", "급배기방식": "FF",
+     "용량": "22L, 27L, 33L, 43L", "비고": "대리점유통", "전환여부": "전환불가"},
+
+
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB900", "연료": "LNG", "급배기방식": "FF",
+     "용량": "43L, 52L", "비고": "대리점유통", "전환여부": "전환불가"},
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB900", "연료": "LPG", "급배기방식": "FF",
+     "용량": "43L, 52L", "비고": "대리점유통", "전환여부": "전환불가"},
+
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NPW(single)", "연료": "LNG", "급배기방식": "FF",
+     "용량": "36KSS, 36KDS, 48KSS, 48KDS", "비고": "단품용", "전환여부": "전환가능"},
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NPW(single)", "연료": "LNG", "급배기방식": "FE",
+     "용량": "36KSS, 36KDS, 48KSS, 48KDS", "비고": "단품용", "전환여부": "전환가능"},
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NPW(single)", "연료": "LPG", "급배기방식": "FF",
+     "용량": "36KSS, 36KDS, 48KSS, 48KDS", "비고": "단품용", "전환여부": "전환가능"},
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NPW(single)", "연료": "LPG", "급배기방식": "FE",
+     "용량": "36KSS, 36KDS, 48KSS, 48KDS", "비고": "단품용", "전환여부": "전환가능"},
+
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB790(single)", "연료": "LNG", "급배기방식": "FF",
+     "용량": "45LSS", "비고": "단품용", "전환여부": "전환가능"},
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB790(single)", "연료": "LNG", "급배기방식": "FE",
+     "용량": "45LSS", "비고": "단품용", "전환여부": "전환가능"},
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB790(single)", "연료": "LPG", "급배기방식": "FF",
+     "용량": "45LSS", "비고": "단품용", "전환여부": "전환가능"},
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB790(single)", "연료": "LPG", "급배기방식": "FE",
+     "용량": "45LSS", "비고": "단품용", "전환여부": "전환가능"},
+
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NFB790(single)", "연료": "LNG", "급배기방식": "FF",
+     "용량": "75LSS, 100LSS", "비고": "단품용", "전환여부": "전환가능"},
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB790(single)", "연료": "LNG", "급배기방식": "FE",
+     "용량": "75LSS, 100LSS", "비고": "단품용", "전환여부": "전환가능"},
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB790(single)", "연료": "LPG", "급배기방식": "FF",
+     "용량": "75LSS, 100LSS", "비고": "단품용", "전환여부": "전환가능"},
+    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB790(single)", "연료": "LPG", "급배기방식": "FE",
+     "용량": "75LSS, 100LSS", "비고": "단품용", "전환여부": "전환가능"},
+
+    # ── 캐스케이드용 밀폐식 ──
+    {"구분": "캐스케이드용", "세부구분": "밀폐식", "모델명": "NPW", "연료": "LNG", "급배기방식": "FF",
+     "용량": "36KS, 36KD, 48KS, 48KD", "비고": "캐스케이드용", "전환여부": "전환가능"},
+    {"구분": "캐스케이드용", "세부구분": "밀폐식", "모델명": "NPW", "연료": "LNG", "급배기방식": "FE",
+     "용량": "36KS, 36KD, 48KS, 48KD", "비고": "캐스케이드용", "전환여부": "전환가능"},
+    {"구분": "캐스케이드용", "세부구분": "밀폐식", "모델명": "NPW", "연료": "LPG", "급배기방식": "FF",
+     "용량": "36KS, 36KD, 48KS, 48KD", "비고": "캐스케이드용", "전환여부": "전환가능"},
+    {"구분": "캐스케이드용", "세부구분": "밀폐식", "모델명": "NPW", "연료": "LPG", "급배기방식": "FE",
+     "용량": "36KS, 36KD, 48KS, 48KD", "비고": "캐스케이드용", "전환여부": "전환가능"},
+
+    {"구분": "캐스케이드용", "세부구분": "밀폐식", "모델명": "NCB790", "연료": "LNG", "급배기방식": "FF",
+     "용량": "45LS", "비고": "캐스케이드용", "전환여부": "전환가능"},
+    {"구분": "캐스케이드용", "세부구분": "밀폐식", "모델명": "NCB790", "연료": "LNG", "급배기방식": "FE",
+     "용량": "45LS", "비고": "캐스케이드용", "전환여부": "전환가능"},
+    {"구분": "캐스케이드용", "세부구분": "밀폐식", "모델명": "NCB790", "연료": "LPG", "급배기방식": "FF",
+     "용량": "45LS", "비고": "캐스케이드용", "전환여부": "전환가능"},
+    {"구분": "캐스케이드용", "세부구분": "밀폐식", "모델명": "NCB790", "연료": "LPG", "급배기방식": "FE",
+     "용량": "45LS", "비고": "캐스케이드용", "전환여부": "전환가능"},
+
+    {"구분": "캐스케이드용", "세부구분": "밀폐식", "모델명": "NFB790", "연료": "LNG", "급배기방식": "FF",
+     "용량": "100LS", "비고": "캐스케이드용", "전환여부": "전환가능"},
+    {"구분": "캐스케이드용", "세부구분": "밀폐식", "모델명": "NFB790", "연료": "LNG", "급배기방식": "FE",
+     "용량": "100LS", "비고": "캐스케이드용", "전환여부": "전환가능"},
+    {"구분": "캐스케이드용", "세부구분": "밀폐식", "모델명": "NFB790", "연료": "LPG", "급배기방식": "FF",
+     "용량": "100LS", "비고": "캐스케이드용", "전환여부": "전환가능"},
+    {"구분": "캐스케이드용", "세부구분": "밀폐식", "모델명": "NFB790", "연료": "LPG", "급배기방식": "FE",
+     "용량": "100LS", "비고": "캐스케이드용", "전환여부": "전환가능"},
+]
+
+# ────────────────────────────────────────────────
+# 2) SKU 단위 조회
+# ────────────────────────────────────────────────
+# 제품 선택 드롭다운 순서 (구분 → … → 급배기방식)
+SKU_KEYS = ("구분", "세부구분", "모델명", "용량", "연료", "급배기방식")
+
+# 딥링크 URL 파라미터 이름 (URL 에는 영문 키 사용)
+DEEP_LINK_PARAMS = {
+    "구분": "cat",
+    "세부구분": "sub",
+    "모델명": "model",
+    "용량": "cap",
+    "연료": "fuel",
+    "급배기방식": "vent",
+}
+
+
+def split_capacity(text: str) -> list[str]:
+    return ["없음"] if text.strip() == "없음" else [c.strip() for c in text.split(",")]
+
+
+def iter_skus(rows=data):
+    """용량을 하나씩 펼친 SKU 행을 돌려준다.
+
+    같은 선택 조합이 여러 행에 있으면 앱의 판별하기(첫 번째 행 사용)와 같이 첫 행만 사용합니다.
+    """
+    seen = set()
+    for row in rows:
+        for cap in split_capacity(row["용량"]):
+            sku = dict(row, 용량=cap)
+            key = tuple(sku[k] for k in SKU_KEYS)
+            if key in seen:
+                continue
+            seen.add(key)
+            yield sku
+
+
+def find_sku(selection: dict, rows=data) -> dict | None:
+    for sku in iter_skus(rows):
+        if all(sku[k] == selection.get(k) for k in SKU_KEYS):
+            return sku
+    return None
+
+
+def deep_link(base_url: str, sku: dict, brand: str | None = None) -> str:
+    """제품 선택과 판별 결과가 채워진 product 페이지 URL. brand 가 없으면 앱은 기본 제조사로 엶."""
+    params = {} if brand is None else {"brand": brand}
+    params.update({p: sku[k] for k, p in DEEP_LINK_PARAMS.items()})
+    query = urlencode(params)
+    return f"{base_url.rstrip('/')}/?{query}"
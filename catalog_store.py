@@ -0,0 +1,415 @@
+"""제조사 / 구분별로 나눈 카탈로그 샤드.
+
+제품 목록을 (제조사, 구분) 단위 샤드 파일로 나눠 저장하고, 사용자가 그 제조사·구분을 고를 때만 엽니다.
+샤드는 열 단위(column) 형식으로, 열마다 값 사전 + uint16 코드 배열을 담고 mmap 으로 읽으므로
+같은 파일을 여는 모든 세션·프로세스가 OS 페이지 캐시를 함께 씁니다.
+오래 쓰지 않은 샤드는 캐시에서 빠지고, 마지막 참조가 사라지면 mmap 도 닫힙니다.
+
+    python catalog_store.py build      # catalog.py 의 기본 목록 + KD_CATALOG_SRC/<제조사>.json 으로 샤드 생성
+    python catalog_store.py info       # 제조사·구분별 행 수 / 파일 크기
+
+실행 중인 앱은 CHECK_INTERVAL(10초)마다 원본 파일의 크기·수정 시각만 확인하고, 바뀌었으면 별도 프로세스로
+위 build 를 실행해 다시 만드는 동안 기존 샤드로 응답합니다 (앱 프로세스는 원본 전체를 읽지 않음).
+다른 제조사 원본 JSON 은 catalog.py 의 data 와 같은 항목(구분, 세부구분, 모델명, …)의 행 목록입니다.
+
+환경변수
+    KD_CATALOG_DIR         샤드 폴더 (기본 data/catalog)
+    KD_CATALOG_SRC         다른 제조사 원본 JSON 폴더 (기본 catalog_src/)
+    KD_CATALOG_IDLE        마지막 사용 후 샤드를 열어 두는 시간(초, 기본 600)
+    KD_CATALOG_MAX_SHARDS  동시에 열어 두는 샤드 수 한도 (기본 32)
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import subprocess
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+import catalog
+
+DATA_DIR = os.environ.get("KD_DATA_DIR", "data")
+CATALOG_DIR = os.environ.get("KD_CATALOG_DIR") or os.path.join(DATA_DIR, "catalog")
+SOURCE_DIR = os.environ.get("KD_CATALOG_SRC", "catalog_src")
+
+DEFAULT_BRAND = "경동나비엔"      # catalog.py 의 기본 목록
+COLUMNS = ("구분", "세부구분", "모델명", "연료", "급배기방식", "용량", "비고", "전환여부")
+INDEX = "index.json"
+MAGIC = b"KDS1"
+FORMAT_VERSION = 1
+CHECK_INTERVAL = 10      # index.json / 원본 파일 변경 확인 주기(초)
+
+
+# ────────────────────────────────────────────────
+# 샤드 파일 (MAGIC | 머리글 길이 u32 | 머리글 JSON | 열마다 uint16 코드 × 행 수)
+# ────────────────────────────────────────────────
+def write_shard(path: str, rows: list[dict]):
+    values = {c: [] for c in COLUMNS}
+    codes = {c: array("H") for c in COLUMNS}
+    lookup = {c: {} for c in COLUMNS}
+    for row in rows:
+        for c in COLUMNS:
+            v = str(row.get(c, ""))
+            code = lookup[c].get(v)
+            if code is None:
+                if len(values[c]) >= 0xFFFF:
+                    raise ValueError(f"'{c}' 값 종류가 너무 많습니다 (샤드당 65535개 이하).")
+                code = lookup[c][v] = len(values[c])
+                values[c].append(v)
+            codes[c].append(code)
+
+    header = json.dumps({"rows": len(rows), "values": values}, ensure_ascii=False).encode()
+    header += b" " * (len(header) % 2)      # 코드 배열을 2바이트 경계에
+    tmp = _tmp_path(path)
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(header)) + header)
+        for c in COLUMNS:
+            if sys.byteorder == "big":
+                codes[c].byteswap()
+            f.write(codes[c].tobytes())
+    os.replace(tmp, path)
+
+
+class Shard:
+    """읽기 전용 샤드. 거르기는 코드 배열로 하고, 행은 필요한 것만 풀어 냄 (rows() 는 한 번 풀어서 보관)."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:4] != MAGIC:
+            raise ValueError(f"샤드 파일 형식이 아닙니다: {path}")
+        (header_len,) = struct.unpack_from("<I", self._mm, 4)
+        header = json.loads(self._mm[8:8 + header_len])
+        self.path = path
+        self.nbytes = len(self._mm)
+        self.n = header["rows"]
+        self.values = header["values"]
+        self._base = 8 + header_len
+        self._rows = None
+
+    def __len__(self):
+        return self.n
+
+    def _codes(self, column: str) -> array:
+        start = self._base + COLUMNS.index(column) * self.n * 2
+        codes = array("H")
+        codes.frombytes(self._mm[start:start + self.n * 2])
+        if sys.byteorder == "big":      # 파일은 little-endian
+            codes.byteswap()
+        return codes
+
+    def select(self, where: dict | None = None) -> list[int]:
+        """where({열: 값 또는 값 목록}) 에 모두 맞는 행 번호. 행을 풀지 않고 코드 배열만 비교."""
+        found = range(self.n)
+        for column, wanted in (where or {}).items():
+            wanted = wanted if isinstance(wanted, (list, tuple, set)) else [wanted]
+            want_codes = {code for code, v in enumerate(self.values[column]) if v in wanted}
+            codes = self._codes(column)
+            found = [i for i in found if codes[i] in want_codes]
+        return list(found)
+
+    def distinct(self, column: str, where: dict | None = None) -> list[str]:
+        """열의 값 목록 (원본 등장 순서). where 가 없으면 머리글만 읽음."""
+        if not where:
+            return list(self.values[column])
+        codes = self._codes(column)
+        return [self.values[column][code] for code in dict.fromkeys(codes[i] for i in self.select(where))]
+
+    def row(self, i: int) -> dict:
+        """i 번째 행 하나만 풀어서 돌려준다."""
+        if not 0 <= i < self.n:
+            raise IndexError(i)
+        return {
+            c: self.values[c][struct.unpack_from("<H", self._mm, self._base + (k * self.n + i) * 2)[0]]
+            for k, c in enumerate(COLUMNS)
+        }
+
+    def find_sku(self, selection: dict) -> dict | None:
+        """catalog.find_sku 와 같은 결과. 코드 배열로 찾고 맞는 행 하나만 풀어 냄."""
+        cap = selection.get("용량")
+        where = {k: selection.get(k) for k in catalog.SKU_KEYS if k != "용량"}
+        where["용량"] = [v for v in self.values["용량"] if cap in catalog.split_capacity(v)]
+        found = self.select(where)
+        return dict(self.row(found[0]), 용량=cap) if found else None
+
+    def rows(self) -> list[dict]:
+        """모든 행 (CLI·색인 생성용). 앱 화면에서는 select/row 를 씀."""
+        if self._rows is None:
+            cols = [(c, self.values[c], self._codes(c)) for c in COLUMNS]
+            self._rows = [{c: vals[codes[i]] for c, vals, codes in cols} for i in range(self.n)]
+        return self._rows
+
+
+# ────────────────────────────────────────────────
+# 샤드 생성
+# ────────────────────────────────────────────────
+def _shard_file(brand: str, category: str) -> str:
+    return hashlib.sha1(f"{brand}\0{category}".encode()).hexdigest()[:16] + ".kds"
+
+
+def _tmp_path(path: str) -> str:
+    # 여러 워커 프로세스가 동시에 만들어도 서로의 임시 파일을 덮어쓰지 않도록
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def source_files(source_dir: str = SOURCE_DIR) -> list[tuple[str, str]]:
+    """(제조사, 원본 파일). 기본 제조사(catalog.py)가 먼저."""
+    files = [(DEFAULT_BRAND, os.path.abspath(catalog.__file__))]
+    try:
+        names = sorted(n for n in os.listdir(source_dir) if n.endswith(".json"))
+    except FileNotFoundError:
+        names = []
+    return files + [(n[:-5], os.path.join(source_dir, n)) for n in names]
+
+
+def source_fingerprint(source_dir: str = SOURCE_DIR) -> str:
+    """원본 파일의 (이름, 크기, 수정 시각) 지문. 파일 내용은 읽지 않음."""
+    stats = []
+    for brand, path in source_files(source_dir):
+        try:
+            st = os.stat(path)
+            stats.append([brand, os.path.basename(path), st.st_size, st.st_mtime_ns])
+        except OSError:
+            stats.append([brand, os.path.basename(path), None, None])
+    raw = json.dumps([FORMAT_VERSION, stats], ensure_ascii=False)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def iter_sources(source_dir: str = SOURCE_DIR):
+    """(제조사, 원본 행 목록) 을 제조사 하나씩 읽어서 돌려준다."""
+    for brand, path in source_files(source_dir):
+        if path.endswith(".py"):
+            rows = list(catalog.data)
+            extra = os.path.join(source_dir, f"{DEFAULT_BRAND}.json")
+            if os.path.exists(extra):           # 기본 제조사의 추가 모델
+                with open(extra, encoding="utf-8") as f:
+                    rows += json.load(f)
+        elif brand == DEFAULT_BRAND:
+            continue
+        else:
+            with open(path, encoding="utf-8") as f:
+                rows = json.load(f)
+        yield brand, rows
+
+
+def build(out_dir: str = CATALOG_DIR, source_dir: str = SOURCE_DIR) -> dict:
+    """샤드와 index.json 을 만든다. 원본은 제조사 하나씩 읽고, 파일마다 임시 파일 → 교체라
+    실행 중인 앱도 안전하게 읽음. 앱은 별도 프로세스(python catalog_store.py build)로 실행."""
+    # 읽기 전에 지문을 계산 (읽는 도중 원본이 바뀌면 다음 확인 때 다시 만들어짐)
+    fingerprint = source_fingerprint(source_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    brands = {}
+    for brand, rows in iter_sources(source_dir):
+        by_category = {}
+        for row in rows:
+            by_category.setdefault(row["구분"], []).append(row)
+        brands[brand] = {}
+        for category, cat_rows in by_category.items():
+            name = _shard_file(brand, category)
+            write_shard(os.path.join(out_dir, name), cat_rows)
+            brands[brand][category] = {"file": name, "rows": len(cat_rows)}
+
+    index = {"version": FORMAT_VERSION, "source": fingerprint, "brands": brands}
+    path = os.path.join(out_dir, INDEX)
+    tmp = _tmp_path(path)
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+    # 목록에서 빠진 샤드 삭제
+    keep = {e["file"] for cats in brands.values() for e in cats.values()}
+    for name in os.listdir(out_dir):
+        if name.endswith(".kds") and name not in keep:
+            try:
+                os.remove(os.path.join(out_dir, name))
+            except FileNotFoundError:       # 동시에 실행된 다른 build 가 먼저 지움
+                pass
+    return index
+
+
+# ────────────────────────────────────────────────
+# 샤드 캐시 (프로세스당 하나, 모든 세션이 공유)
+# ────────────────────────────────────────────────
+class CatalogStore:
+    def __init__(self, root: str, idle: float = 600, max_shards: int = 32, source_dir: str = SOURCE_DIR):
+        self.root = root
+        self.idle = idle
+        self.max_shards = max_shards
+        self.source_dir = source_dir
+        self._lock = threading.Lock()
+        self._index = None
+        self._index_mtime = 0
+        self._last_check = 0.0
+        self._building = False
+        self._open = OrderedDict()     # (제조사, 구분) → [Shard, 마지막 사용]
+        self._derived = OrderedDict()  # 키 → [파생 객체, 마지막 사용, 원본 지문]
+
+    def _index_path(self) -> str:
+        return os.path.join(self.root, INDEX)
+
+    def _read_index(self):
+        """index.json 이 바뀌었으면 다시 읽음. 잠금을 잡은 상태에서 호출."""
+        try:
+            mtime = os.stat(self._index_path()).st_mtime
+        except OSError:
+            return
+        if self._index is not None and mtime == self._index_mtime:
+            return
+        try:
+            with open(self._index_path(), encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Warning: catalog index {self._index_path()} unreadable: {e}")
+            return
+        self._open.clear()             # 새 샤드 파일로 바뀜
+        self._derived.clear()
+        self._index, self._index_mtime = index, mtime
+
+    def _run_build(self) -> bool:
+        # 원본 전체를 읽는 작업은 앱 프로세스 밖에서 (앱의 메모리는 여는 샤드에만 비례)
+        cmd = [sys.executable, os.path.abspath(__file__), "build", "--out", self.root, "--src", self.source_dir]
+        try:
+            subprocess.run(cmd, check=True, capture_output=True, text=True)
+            return True
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"Warning: catalog shards could not be rebuilt in {self.root}: {getattr(e, 'stderr', None) or e}")
+            return False
+
+    def _build_in_background(self):
+        def run():
+            self._run_build()
+            with self._lock:
+                self._building = False
+                self._last_check = 0.0     # 다음 조회 때 새 index.json 을 읽음
+        self._building = True
+        threading.Thread(target=run, daemon=True).start()
+
+    def _load_index(self) -> dict:
+        """현재 색인. CHECK_INTERVAL 마다 index.json 과 원본 파일 지문을 확인하고, 원본이 바뀌었으면
+        별도 프로세스에서 다시 만드는 동안 기존 샤드로 응답. 잠금을 잡은 상태에서 호출."""
+        now = time.monotonic()
+        if self._index is not None and now - self._last_check < CHECK_INTERVAL:
+            return self._index
+        self._last_check = now
+        self._read_index()
+        if self._index is None:
+            # 처음 시작하는데 샤드가 없으면 다 만들 때까지 기다림
+            if not self._run_build():
+                raise RuntimeError(f"catalog shards unavailable in {self.root}")
+            self._read_index()
+            if self._index is None:
+                raise RuntimeError(f"catalog index missing in {self.root}")
+        elif not self._building and self._index.get("source") != source_fingerprint(self.source_dir):
+            self._build_in_background()
+        return self._index
+
+    def brands(self) -> list[str]:
+        with self._lock:
+            return list(self._load_index()["brands"])
+
+    def categories(self, brand: str) -> list[str]:
+        """구분 목록. 샤드를 열지 않고 index.json 만 읽음."""
+        with self._lock:
+            return list(self._load_index()["brands"].get(brand, {}))
+
+    def shard(self, brand: str, category: str) -> Shard | None:
+        key = (brand, category)
+        with self._lock:
+            for retry in (False, True):
+                entry = self._load_index()["brands"].get(brand, {}).get(category)
+                if entry is None:
+                    return None
+                now = time.monotonic()
+                self._evict(now)
+                cached = self._open.get(key)
+                if cached is None:
+                    try:
+                        cached = self._open[key] = [Shard(os.path.join(self.root, entry["file"])), now]
+                    except FileNotFoundError:
+                        if retry:
+                            raise
+                        self._last_check = 0.0     # 다른 프로세스가 다시 만든 직후 → 새 index.json 으로
+                        continue
+                cached[1] = now
+                self._open.move_to_end(key)
+                while len(self._open) > self.max_shards:
+                    self._open.popitem(last=False)
+                return cached[0]
+
+    def cached(self, key, build):
+        """샤드에서 만든 파생 객체 (예: 제조사별 패싯 색인). 샤드와 같은 기준
+        (KD_CATALOG_IDLE, KD_CATALOG_MAX_SHARDS, 원본 변경)으로 캐시에서 빠짐."""
+        with self._lock:
+            version = self._load_index()["source"]
+            now = time.monotonic()
+            self._evict(now)
+            hit = self._derived.get(key)
+            if hit is not None and hit[2] == version:
+                hit[1] = now
+                self._derived.move_to_end(key)
+                return hit[0]
+        value = build()        # 잠금 밖에서 (build 가 샤드를 읽음)
+        with self._lock:
+            self._derived[key] = [value, time.monotonic(), version]
+            self._derived.move_to_end(key)
+            while len(self._derived) > self.max_shards:
+                self._derived.popitem(last=False)
+        return value
+
+    def _evict(self, now: float):
+        # 샤드를 쓰는 중인 세션이 있으면 그 참조가 사라질 때 mmap 이 닫힘
+        for cache in (self._open, self._derived):
+            for key in [k for k, entry in cache.items() if now - entry[1] > self.idle]:
+                del cache[key]
+
+    def rows(self, brand: str, categories: list[str] | None = None) -> list[dict]:
+        """제조사의 (지정한 구분들의) 원본 행."""
+        out = []
+        for category in self.categories(brand) if categories is None else categories:
+            shard = self.shard(brand, category)
+            if shard is not None:
+                out.extend(shard.rows())
+        return out
+
+    def open_shards(self) -> list[tuple]:
+        """(제조사, 구분, 행 수, 파일 크기) — 현재 열려 있는 샤드."""
+        with self._lock:
+            self._evict(time.monotonic())
+            return [(b, c, len(s), s.nbytes) for (b, c), (s, _) in self._open.items()]
+
+
+store = CatalogStore(
+    CATALOG_DIR,
+    idle=float(os.environ.get("KD_CATALOG_IDLE", 600)),
+    max_shards=int(os.environ.get("KD_CATALOG_MAX_SHARDS", 32)),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="제조사 / 구분별 카탈로그 샤드")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_build = sub.add_parser("build", help="기본 목록 + 원본 JSON 으로 샤드 생성")
+    p_build.add_argument("--out", default=CATALOG_DIR)
+    p_build.add_argument("--src", default=SOURCE_DIR, help="다른 제조사 원본 JSON 폴더")
+    sub.add_parser("info", help="제조사·구분별 행 수 / 파일 크기")
+    args = parser.parse_args()
+
+    if args.cmd == "build":
+        index = build(args.out, args.src)
+        total = sum(e["rows"] for cats in index["brands"].values() for e in cats.values())
+        shards = sum(len(cats) for cats in index["brands"].values())
+        print(f"제조사 {len(index['brands'])}곳, 샤드 {shards}개, {total:,}행 → '{args.out}'")
+    else:
+        for brand in store.brands():
+            for category in store.categories(brand):
+                shard = store.shard(brand, category)
+                print(f"{brand}\t{category}\t{len(shard):,}행\t{shard.nbytes / 1024:.1f}KB")
+
+
+if __name__ == "__main__":
+    main()
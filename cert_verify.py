@@ -0,0 +1,290 @@
+"""연소기 변경 확인서 진위 확인.
+
+확인서를 만들 때마다 입력 내용의 해시와 서명(HMAC-SHA256)을 담은 짧은 검증코드를 발급해
+QR 코드로 인쇄하고, 발급 목록(SQLite)에 기록합니다. 검증 시에는 서명을 먼저 확인하고,
+메모리의 Bloom filter 로 발급 목록에 없는 코드를 SQLite 조회 없이 걸러냅니다.
+다른 프로세스(워커)가 발급한 코드는 발급 목록 파일의 크기·수정 시각이 바뀌었을 때만 읽어 필터에 추가합니다.
+
+    python cert_verify.py KDC1.xxxx                  # 검증코드 또는 QR 의 URL
+    python cert_verify.py --stdin < scanned.txt      # 한 줄에 하나씩 일괄 검증
+
+환경변수
+    KD_CERT_SECRET   서명 키 (없으면 KD_DATA_DIR/cert_secret 에 만들어 재사용)
+    KD_DATA_DIR      발급 목록·서명 키 저장 폴더 (기본 data/)
+    KD_APP_URL       QR 에 넣을 앱 주소 (스캔하면 앱의 검증 화면이 열림)
+"""
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import math
+import os
+import secrets
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from functools import lru_cache
+from urllib.parse import parse_qs, urlparse
+
+DATA_DIR = os.environ.get("KD_DATA_DIR", "data")
+APP_URL = os.environ.get("KD_APP_URL", "https://kd-boiler-checker-63jr3mw5k8dxjkj22mvtzy.streamlit.app/")
+PREFIX = "KDC1."
+
+# 서명 대상 항목 (확인서 표·서명부에 인쇄되는 값)
+SIGNED_FIELDS = ("번호", "연소기명", "수량", "변경일", "작업자_소속", "작업자_성명", "작업자격", "시공업체", "시공관리자")
+
+ID_BYTES, DIGEST_BYTES, SIG_BYTES = 8, 16, 16
+
+# 검증 결과
+VALID = "정상 발급"
+CHANGED = "내용 불일치"
+FORGED = "서명 오류 (위조 또는 손상)"
+UNKNOWN = "발급 기록 없음"
+MALFORMED = "검증코드 형식 오류"
+
+
+_secret_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _read_secret() -> bytes:
+    env = os.environ.get("KD_CERT_SECRET")
+    if env:
+        return env.encode()
+    path = os.path.join(DATA_DIR, "cert_secret")
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+    # 임시 파일에 다 쓴 뒤 link 로 올리므로 다른 프로세스가 빈 키를 읽는 일이 없음
+    os.makedirs(DATA_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(secrets.token_hex(32).encode())
+    os.chmod(tmp, 0o600)
+    try:
+        os.link(tmp, path)
+    except FileExistsError:
+        pass             # 다른 프로세스가 먼저 만듦 → 그 키를 사용
+    finally:
+        os.remove(tmp)
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _secret() -> bytes:
+    with _secret_lock:
+        return _read_secret()
+
+
+def fields_digest(info: dict) -> bytes:
+    canon = {k: info[k].isoformat() if k == "변경일" else str(info[k]) for k in SIGNED_FIELDS}
+    if info.get("units"):
+        # 여러 대 확인서는 표의 모든 행을 서명
+        canon["units"] = [[u["번호"], u["연소기명"], str(u["수량"])] for u in info["units"]]
+    raw = json.dumps(canon, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).digest()[:DIGEST_BYTES]
+
+
+def _sign(cert_id: bytes, digest: bytes) -> bytes:
+    return hmac.new(_secret(), cert_id + digest, hashlib.sha256).digest()[:SIG_BYTES]
+
+
+def _b64(b: bytes) -> str:
+    return base64.urlsafe_b64encode(b).rstrip(b"=").decode()
+
+
+def parse_code(text: str):
+    """검증코드 또는 ?verify=<코드> 가 붙은 URL → (cert_id, digest, sig). 형식이 틀리면 None."""
+    text = text.strip()
+    if not text.startswith(PREFIX):
+        text = (parse_qs(urlparse(text).query).get("verify") or [""])[0]
+    if not text.startswith(PREFIX):
+        return None
+    body = text[len(PREFIX):]
+    try:
+        raw = base64.urlsafe_b64decode(body + "=" * (-len(body) % 4))
+    except ValueError:
+        return None
+    if len(raw) != ID_BYTES + DIGEST_BYTES + SIG_BYTES:
+        return None
+    return raw[:ID_BYTES], raw[ID_BYTES:ID_BYTES + DIGEST_BYTES], raw[ID_BYTES + DIGEST_BYTES:]
+
+
+def verify_url(code: str) -> str:
+    return f"{APP_URL.rstrip('/')}/?verify={code}"
+
+
+# ────────────────────────────────────────────────
+# 발급 목록 (SQLite + Bloom filter)
+# ────────────────────────────────────────────────
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.m = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.k = max(1, round(self.m / capacity * math.log(2)))
+        self.bits = bytearray((self.m + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: bytes):
+        h = hashlib.blake2b(key, digest_size=16).digest()
+        h1, h2 = int.from_bytes(h[:8], "little"), int.from_bytes(h[8:], "little") | 1
+        return ((h1 + i * h2) % self.m for i in range(self.k))
+
+    def add(self, key: bytes):
+        for p in self._positions(key):
+            self.bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    def __contains__(self, key: bytes) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+
+class IssuedIndex:
+    def __init__(self, path: str, capacity: int = 100_000):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS issued ("
+            " cert_id BLOB PRIMARY KEY, digest BLOB NOT NULL, issued_at TEXT NOT NULL, fields TEXT NOT NULL)"
+        )
+        self._db.commit()
+        self.disk_lookups = 0
+        self.catch_ups = 0
+        self._rebuild(capacity)
+
+    def _signature(self) -> tuple:
+        # WAL 모드에서는 커밋마다 -wal 파일이, 체크포인트 때 본 파일이 바뀜 (stat 만, 파일 내용은 읽지 않음)
+        sig = []
+        for p in (self.path, self.path + "-wal"):
+            try:
+                st = os.stat(p)
+                sig.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                sig.append(None)
+        return tuple(sig)
+
+    def _rebuild(self, capacity):
+        # 시작할 때 전체 cert_id 를 읽어 필터를 채움 (용량 초과 시 두 배로 다시 만듦)
+        self._seen = self._signature()      # 읽기 전에 (읽는 중 추가된 행은 다음 확인 때)
+        n = self._db.execute("SELECT COUNT(*) FROM issued").fetchone()[0]
+        bloom = BloomFilter(max(capacity, n * 2))
+        last = 0
+        for rowid, cert_id in self._db.execute("SELECT rowid, cert_id FROM issued"):
+            bloom.add(cert_id)
+            last = max(last, rowid)
+        self.bloom, self.last_rowid = bloom, last
+
+    def _catch_up(self) -> bool:
+        """다른 프로세스가 그 뒤에 발급한 cert_id 를 필터에 추가. 새 행이 있었으면 True. 잠금을 잡은 상태에서 호출.
+
+        발급 목록 파일이 마지막 확인 이후 바뀌지 않았으면 SQLite 를 읽지 않습니다.
+        """
+        sig = self._signature()
+        if sig == self._seen:
+            return False
+        self._seen = sig
+        self.catch_ups += 1
+        last = self._db.execute("SELECT MAX(rowid) FROM issued").fetchone()[0] or 0
+        if last <= self.last_rowid:
+            return False
+        for rowid, cert_id in self._db.execute(
+            "SELECT rowid, cert_id FROM issued WHERE rowid > ?", (self.last_rowid,)
+        ):
+            self.bloom.add(cert_id)
+            self.last_rowid = max(self.last_rowid, rowid)
+        if self.bloom.count > self.bloom.capacity:
+            self._rebuild(self.bloom.capacity * 2)
+        return True
+
+    def add(self, cert_id: bytes, digest: bytes, info: dict):
+        fields = {k: str(info[k]) for k in SIGNED_FIELDS}
+        if info.get("units"):
+            fields["연소기 목록"] = "; ".join(f"{u['번호']} {u['연소기명']} ×{u['수량']}" for u in info["units"])
+        with self._lock:
+            self._db.execute(
+                "INSERT OR IGNORE INTO issued VALUES (?, ?, ?, ?)",
+                (cert_id, digest, datetime.now().isoformat(timespec="seconds"),
+                 json.dumps(fields, ensure_ascii=False)),
+            )
+            self._db.commit()
+            # 자기 행만 추가 (다른 프로세스의 행은 파일이 바뀐 것을 보고 다음 조회 때 읽음)
+            self.bloom.add(cert_id)
+
+    def lookup(self, cert_id: bytes):
+        """(digest, issued_at, fields) 또는 None.
+
+        Bloom filter 에 없으면 발급 목록 파일이 바뀌었는지(stat)만 확인하고, 바뀐 경우에만
+        다른 프로세스가 새로 발급한 행을 읽어 다시 확인합니다. 그 밖의 경우 SQLite 는 읽지 않습니다.
+        """
+        with self._lock:
+            if cert_id not in self.bloom and not (self._catch_up() and cert_id in self.bloom):
+                return None
+            self.disk_lookups += 1
+            row = self._db.execute(
+                "SELECT digest, issued_at, fields FROM issued WHERE cert_id = ?", (cert_id,)
+            ).fetchone()
+        return row and (row[0], row[1], json.loads(row[2]))
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> IssuedIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = IssuedIndex(os.path.join(DATA_DIR, "issued.sqlite3"))
+        return _index
+
+
+# ────────────────────────────────────────────────
+# 발급 / 검증
+# ────────────────────────────────────────────────
+def issue(info: dict) -> str:
+    """확인서 입력값에 대한 검증코드를 발급하고 발급 목록에 기록한다."""
+    digest = fields_digest(info)
+    cert_id = hashlib.sha256(digest + datetime.now().isoformat().encode() + secrets.token_bytes(8)).digest()[:ID_BYTES]
+    get_index().add(cert_id, digest, info)
+    return PREFIX + _b64(cert_id + digest + _sign(cert_id, digest))
+
+
+def verify(code: str, info: dict | None = None) -> tuple[str, dict | None]:
+    """(결과, 발급 기록의 항목). info 를 주면 확인서에 적힌 내용과도 비교한다."""
+    parsed = parse_code(code)
+    if parsed is None:
+        return MALFORMED, None
+    cert_id, digest, sig = parsed
+    if not hmac.compare_digest(sig, _sign(cert_id, digest)):
+        return FORGED, None
+    if info is not None and fields_digest(info) != digest:
+        return CHANGED, None
+    record = get_index().lookup(cert_id)
+    if record is None:
+        return UNKNOWN, None
+    if record[0] != digest:
+        return CHANGED, record[2]
+    return VALID, dict(record[2], 발급일시=record[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="연소기 변경 확인서 진위 확인")
+    parser.add_argument("code", nargs="?", help="검증코드 (KDC1.…) 또는 QR 의 URL")
+    parser.add_argument("--stdin", action="store_true", help="표준입력에서 한 줄에 하나씩 일괄 검증")
+    args = parser.parse_args()
+
+    codes = (line for line in sys.stdin if line.strip()) if args.stdin else [args.code or ""]
+    for code in codes:
+        result, fields = verify(code)
+        print(f"{code.strip()}\t{result}" + (f"\t{json.dumps(fields, ensure_ascii=False)}" if fields else ""))
+
+
+if __name__ == "__main__":
+    main()
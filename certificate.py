@@ -0,0 +1,469 @@
+"""연소기 변경 확인서 ([별지 제44호 서식]) DOCX / PDF 생성.
+
+대리점(dealers.py)마다 머리글·로고가 다르므로, 요청마다 다시 만들지 않도록
+대리점별 템플릿(머리글이 들어간 파싱된 DOCX 문서, PDF 배경, 디코딩된 로고)을 한 번만 만들어
+메모리 한도가 있는 LRU 캐시(template_cache)에 보관합니다.
+
+환경변수
+    KD_TEMPLATE_CACHE_BYTES  템플릿 캐시 메모리 한도 (기본 64MB)
+"""
+import copy
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from io import BytesIO
+
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.shared import Pt, Cm
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from PIL import Image
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
+from reportlab.lib.pagesizes import A4
+from reportlab.lib import colors
+from reportlab.lib.units import mm
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import (
+    SimpleDocTemplate, Paragraph, Table, TableStyle,
+    Spacer, KeepTogether
+)
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.graphics.barcode.qr import QrCodeWidget
+from reportlab.graphics.shapes import Drawing
+import qrcode
+
+from cert_verify import verify_url
+from dealers import DEFAULT_PROFILE
+
+# ────────────────────────────────────────────────
+# 1) 한글 폰트 (프로세스당 한 번만 등록)
+# ────────────────────────────────────────────────
+# 가능한 한글 폰트 파일 이름 목록
+KOREAN_FONT_FILES = ['NanumGothic.ttf', 'NanumGothicBold.ttf', 'UnDotum.ttf', 'gulim.ttc', 'batang.ttc', 'malgun.ttf']
+
+# 시스템 폰트 디렉토리 탐색
+FONT_DIRS = ['/usr/share/fonts/truetype/nanum', # 우분투 나눔 폰트 경로
+             '/usr/share/fonts/truetype/unfonts-core', # 우분투 unfonts-core 경로
+             '/usr/share/fonts/truetype', # 일반적인 리눅스 트루타입 폰트 경로
+             'C:/Windows/Fonts' # 윈도우 폰트 경로
+            ]
+
+
+def korean_font_paths():
+    """설치된 한글 폰트 파일 경로 (찾은 순서). QR 라벨(generate_qr.py)도 사용."""
+    for font_dir in FONT_DIRS:
+        if not os.path.exists(font_dir):
+            continue
+        for font_file in KOREAN_FONT_FILES:
+            font_path = os.path.join(font_dir, font_file)
+            if os.path.exists(font_path):
+                yield font_path
+
+
+@lru_cache(maxsize=None)
+def korean_font_name() -> str:
+    # Streamlit Cloud 환경을 위해 시스템 폰트 사용 시도
+    korean_font = 'Helvetica' # 기본값
+
+    for font_path in korean_font_paths():
+        try:
+            pdfmetrics.registerFont(TTFont('KoreanFont', font_path))
+            return 'KoreanFont'
+        except Exception as e:
+            print(f"Error registering font {font_path}: {e}")
+
+    print("Warning: Korean font not found. Using Helvetica instead.")
+    return korean_font
+
+
+# ────────────────────────────────────────────────
+# 2) 대리점별 템플릿 + LRU 캐시
+# ────────────────────────────────────────────────
+LOGO_HEIGHT = 12 * mm
+
+class TemplateCache:
+    """메모리 한도(바이트)가 있는 LRU 캐시. build 는 키당 한 번만 실행."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.total = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()    # key → template
+        self._lock = threading.Lock()
+        self._building = {}            # key → Lock (같은 템플릿 동시 생성 방지)
+
+    def get(self, key, build):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            key_lock = self._building.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                if key in self._items:
+                    self.hits += 1
+                    return self._items[key]
+            template = build()
+            with self._lock:
+                self.misses += 1
+                self._building.pop(key, None)
+                self._items[key] = template
+                self.total += template["size"]
+                # 한도를 넘으면 오래 쓰지 않은 것부터 제거 (방금 만든 것은 유지)
+                while self.total > self.max_bytes and len(self._items) > 1:
+                    _, old = self._items.popitem(last=False)
+                    self.total -= old["size"]
+            return template
+
+
+template_cache = TemplateCache(int(os.environ.get("KD_TEMPLATE_CACHE_BYTES", str(64 * 1024 * 1024))))
+
+
+def get_template(profile: dict) -> dict:
+    return template_cache.get((profile["id"], profile["fingerprint"]), lambda: build_template(profile))
+
+
+def build_template(profile: dict) -> dict:
+    korean_font = korean_font_name()
+
+    # 로고는 한 번만 디코딩
+    logo_png, logo_reader, logo_w = None, None, 0
+    if profile.get("logo"):
+        try:
+            img = Image.open(profile["logo"]).convert("RGBA")
+            out = BytesIO()
+            img.save(out, format="PNG")
+            logo_png = out.getvalue()
+            logo_reader = ImageReader(img)
+            logo_w = LOGO_HEIGHT * img.width / img.height
+        except Exception as e:
+            print(f"Error loading dealer logo {profile['logo']}: {e}")
+    header_text = profile.get("header_text", "")
+
+    # DOCX: 여백, 머리글(로고·문구), 제목까지
+    doc = Document()
+    sec = doc.sections[0]
+    for m in ("top_margin", "bottom_margin", "left_margin", "right_margin"):
+        setattr(sec, m, Pt(35))
+
+    if logo_png or header_text:
+        hp = sec.header.paragraphs[0]
+        if logo_png:
+            hp.add_run().add_picture(BytesIO(logo_png), height=Cm(1.2))
+        if header_text:
+            hp.add_run(("   " if logo_png else "") + header_text).font.size = Pt(9)
+
+    # 제목
+    doc.add_paragraph("[별지 제44호 서식]<개정 23.07.11>").runs[0].font.size = Pt(10)
+    p = doc.add_paragraph("연소기 변경 확인서")
+    p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    p.runs[0].bold = True
+    p.runs[0].font.size = Pt(16)
+
+    p = doc.add_paragraph("(제4-22조 및 제4-31조 관련)")
+    p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    p.runs[0].font.size = Pt(10)
+    doc.add_paragraph()
+
+    # 저장 → 다시 읽은 문서를 보관 (요청마다 파싱하지 않고 deepcopy 만)
+    docx_buf = BytesIO()
+    doc.save(docx_buf)
+    document = Document(BytesIO(docx_buf.getvalue()))
+
+    # PDF: 머리글 배경 (위치는 미리 계산해 두고 페이지마다 그리기만 함)
+    page_w, page_h = A4
+    has_header = bool(logo_reader or header_text)
+    logo_y = page_h - 14 - LOGO_HEIGHT
+    text_x = 20 + (logo_w + 6 if logo_reader else 0)
+    text_y = page_h - 14 - LOGO_HEIGHT / 2 - 3
+
+    def pdf_background(canvas, _doc):
+        if not has_header:
+            return
+        canvas.saveState()
+        if logo_reader:
+            canvas.drawImage(logo_reader, 20, logo_y, width=logo_w, height=LOGO_HEIGHT, mask="auto")
+        if header_text:
+            canvas.setFont(korean_font, 9)
+            canvas.drawString(text_x, text_y, header_text)
+        canvas.setLineWidth(0.5)
+        canvas.line(20, logo_y - 4, page_w - 20, logo_y - 4)
+        canvas.restoreState()
+
+    # 파싱된 문서는 압축을 푼 XML 파트 크기로 어림
+    size = sum(len(part.blob) for part in document.part.package.iter_parts()) + (len(logo_png) if logo_png else 0)
+    if logo_reader:
+        size += img.width * img.height * 4     # 디코딩된 이미지
+    return {
+        "id": profile["id"],
+        "font": korean_font,
+        "document": document,
+        "pdf_background": pdf_background,
+        "pdf_top_margin": 20 + (LOGO_HEIGHT + 14 if has_header else 0),
+        "size": size,
+    }
+
+
+# ────────────────────────────────────────────────
+# 3) 확인서 생성
+# ────────────────────────────────────────────────
+QR_SIZE = 22 * mm
+
+def certificate_units(info: dict) -> list[dict]:
+    """확인서 표의 연소기 행 목록. info["units"] 가 없으면 한 대(번호·연소기명·수량)."""
+    return info.get("units") or [{"번호": info["번호"], "연소기명": info["연소기명"], "수량": info["수량"]}]
+
+
+def _repeat_as_header(row):
+    # 페이지가 넘어가면 이 행을 표 머리글로 반복
+    el = OxmlElement("w:tblHeader")
+    el.set(qn("w:val"), "true")
+    row._tr.get_or_add_trPr().append(el)
+
+
+def verify_qr_table(code: str, style) -> Table:
+    widget = QrCodeWidget(verify_url(code), barLevel="M")
+    x1, y1, x2, y2 = widget.getBounds()
+    drawing = Drawing(QR_SIZE, QR_SIZE, transform=[QR_SIZE / (x2 - x1), 0, 0, QR_SIZE / (y2 - y1), 0, 0])
+    drawing.add(widget)
+    t = Table([[Paragraph(f"진위 확인<br/>{code}", style), drawing]], colWidths=[70 * mm, QR_SIZE + 4])
+    t.hAlign = "RIGHT"
+    t.setStyle(TableStyle([('VALIGN', (0,0), (-1,-1), 'BOTTOM')]))
+    return t
+
+def make_docx(info: dict, sign_png: BytesIO | None, template: dict | None = None) -> BytesIO:
+    template = template or get_template(DEFAULT_PROFILE)
+    # 여백·대리점 머리글·제목까지 들어 있는 템플릿에서 시작
+    doc = copy.deepcopy(template["document"])
+
+    # 기본 표 (머리글 2행 + 연소기마다 1행)
+    tbl = doc.add_table(rows=2, cols=8)
+    tbl.style = "Table Grid"
+    h = tbl.rows[0].cells
+    h[0].text, h[1].text, h[2].text = "번호", "연소기명", "수량"
+    h[3].text, h[4].text = "변경내역", "변경일자"
+    h[5].merge(h[7]).text = "연소기 변경 작업자"
+    sub = tbl.rows[1].cells
+    sub[0].merge(tbl.cell(0, 0)); sub[1].merge(tbl.cell(0, 1)); sub[2].merge(tbl.cell(0, 2))
+    sub[3].merge(tbl.cell(0, 3)); sub[4].merge(tbl.cell(0, 4))
+    sub[5].text, sub[6].text, sub[7].text = "소 속", "성명(서명)", "작업자격"
+    _repeat_as_header(tbl.rows[0]); _repeat_as_header(tbl.rows[1])
+
+    변경일자 = info["변경일"].strftime("%Y-%m-%d")
+    for unit in certificate_units(info):
+        d = tbl.add_row().cells          # 새 행의 셀만 접근 (행 수에 비례하는 비용)
+        d[0].text, d[1].text, d[2].text = unit["번호"], unit["연소기명"], str(unit["수량"])
+        d[3].text = "✔ 가스보일러 급배기방식 전환"
+        d[4].text = 변경일자
+        d[5].text, d[6].text, d[7].text = info["작업자_소속"], info["작업자_성명"], info["작업자격"]
+
+    # 확인 문구 (확인·서명부는 한 페이지에 함께)
+    doc.add_paragraph().paragraph_format.keep_with_next = True
+    doc.add_paragraph("상기와 같이 연소기 변경 작업을 실시하였음을 확인합니다.").paragraph_format.keep_with_next = True
+ # 날짜(우측 정렬)
+    p_date = doc.add_paragraph(info["변경일"].strftime("%Y년 %m월 %d일"))
+    p_date.alignment = WD_ALIGN_PARAGRAPH.RIGHT
+    p_date.paragraph_format.keep_with_next = True
+
+    # 시공업체 줄 (우측 정렬)
+    p_comp = doc.add_paragraph(f"○ 시공업체(상호): {info['시공업체']}")
+    p_comp.alignment = WD_ALIGN_PARAGRAPH.RIGHT
+    p_comp.paragraph_format.keep_with_next = True
+
+    # 시공관리자 + 서명
+    if sign_png:
+        p_mgr = doc.add_paragraph()
+        p_mgr.alignment = WD_ALIGN_PARAGRAPH.RIGHT      # ← 단락 정렬
+        run = p_mgr.add_run(f"○ 시공관리자  : {info['시공관리자']}   (서명) ")
+    else:
+        p_mgr = doc.add_paragraph(f"○ 시공관리자  : {info['시공관리자']}   (서명) ")
+        p_mgr.alignment = WD_ALIGN_PARAGRAPH.RIGHT
+
+    # 진위 확인 QR (검증코드가 발급된 경우)
+    if info.get("검증코드"):
+        qr_png = BytesIO()
+        qrcode.make(verify_url(info["검증코드"]), border=1).save(qr_png)
+        qr_png.seek(0)
+        p_qr = doc.add_paragraph()
+        p_qr.alignment = WD_ALIGN_PARAGRAPH.RIGHT
+        p_qr.add_run().add_picture(qr_png, width=Cm(2.2))
+        p_qr.add_run("\n진위 확인 " + info["검증코드"]).font.size = Pt(7)
+
+    # [비고] 표
+    doc.add_paragraph()
+    note_tbl = doc.add_table(rows=1, cols=1)
+    note_tbl.style = "Table Grid"
+    note = (
+        "[비고]\n"
+        "1. 변경내역은 해당되는 사항에 ✔ 표시\n"
+        "2. 기술능력은 연소기 변경 작업자의 자격 기재\n"
+        "   가. 열량법령 작업자격 : 지침 별표18 (예시 : 연소기 제조사 A/S 종사자)\n"
+        "   나. 가스보일러 급배기방식 전환 작업자격 : KGS GC2008 또는 GC209 (예시 : 가스보일러 제조사 A/S 교육 이수자)"
+    )
+    note_tbl.cell(0, 0).text = note
+
+    # docx 반환
+    buf = BytesIO()
+    doc.save(buf)
+    buf.seek(0)
+    return buf
+
+def make_pdf(info: dict, template: dict | None = None) -> BytesIO:
+    template = template or get_template(DEFAULT_PROFILE)
+    buffer = BytesIO()
+    korean_font = template["font"]
+
+    # 문서 설정
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        rightMargin=20, leftMargin=20,
+        topMargin=template["pdf_top_margin"], bottomMargin=20
+    )
+
+    # 스타일 생성 함수
+    def make_style(name, size, align):
+        return ParagraphStyle(
+            name,
+            fontName=korean_font,
+            fontSize=size,
+            leading=size * 1.6,
+            alignment=align,
+        )
+
+    header_style   = make_style('Header',   9, TA_LEFT)
+    title_style    = make_style('Title',   16, TA_CENTER)
+    subtitle_style = make_style('Subt',    9, TA_CENTER)
+    normal_style   = make_style('Normal',  9, TA_LEFT)
+    right_style    = make_style('Right',   9, TA_RIGHT)
+
+    story = []
+
+    # 제목부
+    story.append(Paragraph("[별지 제44호 서식] <개정 23.07.11>", header_style))
+    story.append(Spacer(1, 4))
+    story.append(Paragraph("<b>연소기 변경 확인서</b>", title_style))
+    story.append(Spacer(1, 4))
+    story.append(Paragraph("(제4-22조 및 제4-31조 관련)", subtitle_style))
+    story.append(Spacer(1, 12))
+
+    # 표 데이터 (머리글 2행 + 연소기마다 1행)
+    변경일자 = info['변경일'].strftime('%Y-%m-%d')
+    # 여기에 선택된 '작업자격'만 넣기 (공백을 줄바꿈으로)
+    작업자격 = info['작업자격'].replace(" ", "\n")
+    table_data = [
+        ['번호','연소기명','수량','변경내역','변경일자','연소기 변경 작업자','',''],
+        ['','','','','','소속','성명(서명)','작업자격'],
+    ]
+    for unit in certificate_units(info):
+        table_data.append([
+            unit['번호'],
+            unit['연소기명'],
+            str(unit['수량']),
+            '✔ 가스보일러\n급배기방식\n전환',
+            변경일자,
+            info['작업자_소속'],
+            info['작업자_성명'],
+            작업자격,
+        ])
+
+
+    # 컬럼 폭 정의 (숫자로만)
+    col_widths = [
+        15* mm,  # 번호
+        35* mm,  # 연소기명
+        8 * mm,  # 수량
+        30 * mm,  # 변경내역 (곱하기 연산자로 수정)
+        25 * mm,  # 변경일자
+        25 * mm,  # 소속
+        25 * mm,  # 성명(서명)
+        25 * mm,  # 작업자격
+    ]
+
+    # 여러 페이지로 나뉘면 머리글 2행 반복
+    table = Table(table_data, colWidths=col_widths, repeatRows=2)
+    table.setStyle(TableStyle([
+        ('GRID',        (0,0), (-1,-1), 0.5, colors.black),
+        ('FONTNAME',    (0,0), (-1,-1), korean_font),
+        ('FONTSIZE',    (0,0), (-1,-1), 9),
+        ('ALIGN',       (0,0), (-1,-1), 'CENTER'),
+        ('VALIGN',      (0,0), (-1,-1), 'MIDDLE'),
+
+        # "변경내역" 셀만 가로·세로 중앙정렬
+        ('ALIGN',       (3,2), (3,-1), 'CENTER'),
+        ('VALIGN',      (3,2), (3,-1), 'MIDDLE'),
+
+        # 병합은 기존 그대로
+        ('SPAN',        (0,0),(0,1)),
+        ('SPAN',        (1,0),(1,1)),
+        ('SPAN',        (2,0),(2,1)),
+        ('SPAN',        (3,0),(3,1)),
+        ('SPAN',        (4,0),(4,1)),
+        ('SPAN',        (5,0),(7,0)),
+
+        # 패딩 축소
+        ('LEFTPADDING',  (0,0),(-1,-1), 2),
+        ('RIGHTPADDING', (0,0),(-1,-1), 2),
+        ('TOPPADDING',   (0,0),(-1,-1), 2),
+        ('BOTTOMPADDING',(0,0),(-1,-1), 2),
+    ]))
+    
+    # 확인 및 서명부
+    confirm = Paragraph("상기와 같이 연소기 변경 작업을 실시하였음을 확인합니다.", normal_style)
+    date_p  = Paragraph(info['변경일'].strftime('%Y년 %m월 %d일'), right_style)
+    comp_p  = Paragraph(f"○ 시공업체(상호): {info['시공업체']}", right_style)
+    mgr_p   = Paragraph(f"○ 시공관리자  : {info['시공관리자']}   (서명)", right_style)
+
+        # ————————————————————————————————————————
+    # 비고 표: HTML 태그로 줄바꿈·들여쓰기
+    note_text = """
+    <b>[비고]</b><br/>
+    1. 변경내역은 해당되는 사항에 표시<br/>
+    2. 기술능력은 연소기 변경 작업자의 자격 기재<br/>
+    &nbsp;&nbsp;가. 열량법령 작업자격 : 지침 별표18 (예시 : 연소기 제조사 A/S 종사자)<br/>
+    &nbsp;&nbsp;나. 가스보일러 급배기방식 전환 작업자격 : KGS GC2008 또는 GC209<br/>
+    &nbsp;&nbsp;&nbsp;&nbsp;(예시 : 가스보일러 제조사 A/S 교육 이수자)
+    """
+    note_para = Paragraph(note_text, normal_style)
+
+    note_table = Table([[note_para]], colWidths=[170*mm])
+    note_table.setStyle(TableStyle([
+        ('GRID',(0,0),(-1,-1),0.5,colors.black),
+        ('FONTNAME',(0,0),(-1,-1),korean_font),
+        ('FONTSIZE',(0,0),(-1,-1),9),
+        ('VALIGN',(0,0),(-1,-1),'TOP'),
+        ('LEFTPADDING',(0,0),(-1,-1),4), ('RIGHTPADDING',(0,0),(-1,-1),4),
+        ('TOPPADDING',(0,0),(-1,-1),4), ('BOTTOMPADDING',(0,0),(-1,-1),4),
+    ]))
+
+    # 진위 확인 QR (검증코드가 발급된 경우)
+    verify_block = []
+    if info.get("검증코드"):
+        verify_block = [Spacer(1,4), verify_qr_table(info["검증코드"], make_style('Code', 7, TA_RIGHT))]
+
+    # 표는 페이지를 넘겨 이어지고, 확인·서명부는 마지막 페이지에 한꺼번에
+    story.append(table)
+    story.append(KeepTogether([
+        Spacer(1,8),
+        confirm,
+        Spacer(1,8),
+        date_p,
+        Spacer(1,4),
+        comp_p,
+        Spacer(1,4),
+        mgr_p,
+        *verify_block,
+        Spacer(1,12),
+        note_table
+    ]))
+
+    # 대리점 머리글(로고·문구)은 매 페이지 배경으로 그림
+    doc.build(story, onFirstPage=template["pdf_background"], onLaterPages=template["pdf_background"])
+    buffer.seek(0)
+    return buffer
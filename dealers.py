@@ -0,0 +1,91 @@
+"""대리점(dealer) 프로필.
+
+KD_DEALER_DIR (기본 dealers/) 폴더의 <대리점ID>.json 한 파일이 한 대리점입니다.
+
+    {
+      "name": "OO대리점",
+      "header_text": "OO대리점 | 02-000-0000",
+      "logo": "oo_logo.png",
+      "defaults": {"시공업체": "OO설비", "시공관리자": "", "작업자_소속": "OO대리점"}
+    }
+
+logo 는 JSON 파일 기준 상대 경로, defaults 는 확인서 입력란 기본값입니다.
+대리점은 URL(?dealer=<ID>) 또는 사이드바에서 세션마다 선택합니다.
+"""
+import json
+import os
+import re
+import threading
+
+DEALER_DIR = os.environ.get("KD_DEALER_DIR", "dealers")
+DEFAULT_DEALER_ID = "default"
+
+DEFAULT_PROFILE = {
+    "id": DEFAULT_DEALER_ID,
+    "name": "기본",
+    "header_text": "",
+    "logo": None,
+    "defaults": {},
+    "fingerprint": 0,
+}
+
+_ID_RE = re.compile(r"^[\w\-]+$")
+_cache = {}          # id → (fingerprint, profile)
+_lock = threading.Lock()
+
+
+def list_dealers() -> list[str]:
+    try:
+        names = os.listdir(DEALER_DIR)
+    except FileNotFoundError:
+        return []
+    return sorted(n[:-5] for n in names if n.endswith(".json"))
+
+
+def _mtime(path) -> float:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return 0
+
+
+def get_dealer(dealer_id: str | None) -> dict:
+    """대리점 프로필. 없거나 읽을 수 없으면 기본 프로필.
+
+    파일이 바뀌지 않았으면 캐시된 프로필을 돌려주며, fingerprint 는 JSON / 로고의 수정 시각이라
+    파일을 고치면 템플릿도 다시 만들어집니다.
+    """
+    if not dealer_id or dealer_id == DEFAULT_DEALER_ID or not _ID_RE.match(dealer_id):
+        return DEFAULT_PROFILE
+    path = os.path.join(DEALER_DIR, f"{dealer_id}.json")
+    json_mtime = _mtime(path)
+    if not json_mtime:
+        return DEFAULT_PROFILE
+
+    with _lock:
+        cached = _cache.get(dealer_id)
+    if cached and cached[0][0] == json_mtime and cached[0][1] == _mtime(cached[1].get("logo") or ""):
+        return cached[1]
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            raw = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Error loading dealer profile {path}: {e}")
+        return DEFAULT_PROFILE
+
+    logo = raw.get("logo")
+    if logo:
+        logo = os.path.join(os.path.dirname(path), logo)
+    fingerprint = (json_mtime, _mtime(logo or ""))
+    profile = {
+        "id": dealer_id,
+        "name": raw.get("name", dealer_id),
+        "header_text": raw.get("header_text", ""),
+        "logo": logo,
+        "defaults": dict(raw.get("defaults", {})),
+        "fingerprint": fingerprint,
+    }
+    with _lock:
+        _cache[dealer_id] = (fingerprint, profile)
+    return profile
@@ -0,0 +1,224 @@
+"""연소기 변경 확인서(make_docx / make_pdf) 생성 스케줄러.
+
+Streamlit 은 모든 세션의 스크립트를 한 프로세스의 스레드에서 실행합니다.
+ReportLab 작업이 한꺼번에 몰리면 model / product 페이지의 가벼운 rerun 까지 밀리므로,
+문서 생성은 이 스케줄러를 거쳐 프로세스당 동시 실행 수를 제한하고
+대기열이 가득 차면 바로 거절(backpressure)합니다.
+
+환경변수
+    KD_DOC_WORKERS    프로세스당 동시 문서 생성 수 (기본 1)
+    KD_DOC_QUEUE      최대 대기 수 (기본 16)
+    KD_METRICS_PORT   지정하면 http://0.0.0.0:<port>/metrics 로 Prometheus 형식 지표 노출
+                      (KD_TRACEMALLOC 을 함께 지정하면 힙 지표와 /debug/heap/… 도 노출, heap_probe.py)
+"""
+import heapq
+import itertools
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import heap_probe
+
+# 우선순위 (숫자가 작을수록 먼저)
+PRIORITY_INTERACTIVE = 0   # 한 장짜리 확인서
+PRIORITY_BULK = 1          # 여러 행 확인서 등 오래 걸리는 작업
+
+WAIT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+POLL_SECONDS = 0.5
+
+
+class SchedulerBusy(RuntimeError):
+    """대기열이 가득 차 요청을 받을 수 없음."""
+
+
+class DocumentScheduler:
+    def __init__(self, workers: int = 1, max_queue: int = 16):
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._cond = threading.Condition()
+        self._running = 0
+        self._queue = []                # (priority, seq) 힙
+        self._bumped = set()            # 높은 우선순위 요청에 밀려난 대기 ticket
+        self._seq = itertools.count()
+
+        # 지표
+        self.admitted = 0
+        self.rejected = 0
+        self.failed = 0
+        self.wait_count = 0
+        self.wait_sum = 0.0
+        self.wait_max = 0.0
+        self.wait_buckets = [0] * len(WAIT_BUCKETS)
+        self.run_count = 0
+        self.run_sum = 0.0
+
+    # ── 실행 ──
+    def run(self, fn, *args, priority=PRIORITY_INTERACTIVE, on_wait=None, **kwargs):
+        """슬롯을 얻을 때까지 기다린 뒤 fn 을 호출 스레드에서 실행한다.
+
+        on_wait(position) 은 대기 순번이 바뀔 때마다 호출됩니다.
+        대기열이 가득 차 있으면 SchedulerBusy 를 발생시킵니다. 단, 더 낮은 우선순위의 대기자가 있으면
+        그 중 가장 늦게 들어온 요청이 대신 SchedulerBusy 로 끝나고 이 요청이 대기열에 들어갑니다.
+        """
+        self._acquire(priority, on_wait)
+        start = time.monotonic()
+        ok = False
+        try:
+            result = fn(*args, **kwargs)
+            ok = True
+            return result
+        finally:
+            self._release(time.monotonic() - start, ok)
+
+    def _acquire(self, priority, on_wait):
+        ticket = (priority, next(self._seq))
+        start = time.monotonic()
+        with self._cond:
+            if self._running < self.workers and not self._queue:
+                self._running += 1
+                self._record_wait(0.0)
+                return
+            if len(self._queue) >= self.max_queue:
+                # 가득 찼으면 더 낮은 우선순위의 마지막 대기자를 밀어냄 (없으면 이 요청을 거절)
+                worst = max(self._queue) if self._queue else None
+                if worst is None or worst[0] <= priority:
+                    self.rejected += 1
+                    raise SchedulerBusy(f"document queue full ({len(self._queue)})")
+                self._queue.remove(worst)
+                heapq.heapify(self._queue)
+                self._bumped.add(worst)
+                self._cond.notify_all()
+            heapq.heappush(self._queue, ticket)
+
+        notified = None
+        try:
+            while True:
+                with self._cond:
+                    if ticket in self._bumped:
+                        self._bumped.discard(ticket)
+                        self.rejected += 1
+                        raise SchedulerBusy("document queue full (preempted by a higher-priority request)")
+                    if self._running < self.workers and self._queue[0] == ticket:
+                        heapq.heappop(self._queue)
+                        self._running += 1
+                        break
+                    position = sorted(self._queue).index(ticket) + 1
+                    if position == notified or on_wait is None:
+                        self._cond.wait(timeout=POLL_SECONDS)
+                        continue
+                # UI 갱신은 잠금 밖에서
+                on_wait(position)
+                notified = position
+        except BaseException:
+            # 세션 종료 / rerun 으로 대기가 중단된 경우 대기열에서 제거
+            with self._cond:
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+                    heapq.heapify(self._queue)
+                self._cond.notify_all()
+            raise
+        with self._cond:
+            self._record_wait(time.monotonic() - start)
+
+    def _release(self, elapsed, ok):
+        with self._cond:
+            self._running -= 1
+            self.run_count += 1
+            self.run_sum += elapsed
+            if not ok:
+                self.failed += 1
+            self._cond.notify_all()
+
+    def _record_wait(self, seconds):
+        self.admitted += 1
+        self.wait_count += 1
+        self.wait_sum += seconds
+        self.wait_max = max(self.wait_max, seconds)
+        for i, le in enumerate(WAIT_BUCKETS):
+            if seconds <= le:
+                self.wait_buckets[i] += 1
+
+    # ── 지표 ──
+    def snapshot(self) -> dict:
+        with self._cond:
+            return dict(
+                queue_depth=len(self._queue),
+                running=self._running,
+                workers=self.workers,
+                max_queue=self.max_queue,
+                admitted=self.admitted,
+                rejected=self.rejected,
+                failed=self.failed,
+                wait_count=self.wait_count,
+                wait_sum=self.wait_sum,
+                wait_max=self.wait_max,
+                wait_buckets=list(self.wait_buckets),
+                run_count=self.run_count,
+                run_sum=self.run_sum,
+            )
+
+    def prometheus_text(self) -> str:
+        m = self.snapshot()
+        lines = [
+            "# TYPE kd_doc_queue_depth gauge", f"kd_doc_queue_depth {m['queue_depth']}",
+            "# TYPE kd_doc_running gauge", f"kd_doc_running {m['running']}",
+            "# TYPE kd_doc_workers gauge", f"kd_doc_workers {m['workers']}",
+            "# TYPE kd_doc_admitted_total counter", f"kd_doc_admitted_total {m['admitted']}",
+            "# TYPE kd_doc_rejected_total counter", f"kd_doc_rejected_total {m['rejected']}",
+            "# TYPE kd_doc_failed_total counter", f"kd_doc_failed_total {m['failed']}",
+            "# TYPE kd_doc_wait_seconds histogram",
+        ]
+        for le, count in zip(WAIT_BUCKETS, m["wait_buckets"]):
+            lines.append(f'kd_doc_wait_seconds_bucket{{le="{le}"}} {count}')
+        lines += [
+            f'kd_doc_wait_seconds_bucket{{le="+Inf"}} {m["wait_count"]}',
+            f"kd_doc_wait_seconds_sum {m['wait_sum']:.6f}",
+            f"kd_doc_wait_seconds_count {m['wait_count']}",
+            "# TYPE kd_doc_render_seconds summary",
+            f"kd_doc_render_seconds_sum {m['run_sum']:.6f}",
+            f"kd_doc_render_seconds_count {m['run_count']}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def start_metrics_server(sched: DocumentScheduler, port: int):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body = sched.prometheus_text() + heap_probe.prometheus_text()
+            else:
+                try:
+                    body = heap_probe.handle(self.path)
+                except ValueError:
+                    self.send_error(400)
+                    return
+                if body is None:
+                    self.send_error(404)
+                    return
+            body = body.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+    except OSError as e:
+        print(f"Warning: metrics server not started on port {port}: {e}")
+        return None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# 프로세스당 하나 (모듈은 프로세스에서 한 번만 import 됨)
+scheduler = DocumentScheduler(
+    workers=int(os.environ.get("KD_DOC_WORKERS", "1")),
+    max_queue=int(os.environ.get("KD_DOC_QUEUE", "16")),
+)
+if os.environ.get("KD_METRICS_PORT"):
+    start_metrics_server(scheduler, int(os.environ["KD_METRICS_PORT"]))
@@ -0,0 +1,73 @@
+"""카탈로그 역검색 (패싯 검색).
+
+용량을 펼친 SKU 목록에 대해 항목값마다 비트맵(파이썬 int, i 번째 비트 = i 번째 SKU)을 미리 만들어 두고,
+선택 조건은 비트 AND/OR 로, 항목값별 건수는 popcount 로 계산합니다.
+같은 항목 안의 여러 값은 OR, 서로 다른 항목끼리는 AND 입니다.
+색인은 제조사별로 만들며, 그 제조사의 샤드(catalog_store.py)만 읽고 샤드와 같은 기준으로 캐시에서 빠집니다.
+"""
+from catalog import iter_skus
+from catalog_store import store as catalog_store, DEFAULT_BRAND
+
+FACETS = ("구분", "세부구분", "연료", "급배기방식", "용량", "비고", "전환여부")
+
+
+class FacetIndex:
+    def __init__(self, skus, facets=FACETS):
+        self.skus = list(skus)
+        self.facets = facets
+        self.all = (1 << len(self.skus)) - 1
+        self.bitmaps = {}
+        for f in facets:
+            positions = {}
+            for i, sku in enumerate(self.skus):
+                positions.setdefault(sku[f], []).append(i)
+            self.bitmaps[f] = {v: self._bitmap(ps) for v, ps in sorted(positions.items())}
+
+    def _bitmap(self, positions) -> int:
+        bits = bytearray((len(self.skus) + 7) // 8)
+        for i in positions:
+            bits[i >> 3] |= 1 << (i & 7)
+        return int.from_bytes(bits, "little")
+
+    def values(self, facet) -> list[str]:
+        return list(self.bitmaps[facet])
+
+    def _facet_mask(self, facet, chosen) -> int:
+        if not chosen:
+            return self.all
+        mask = 0
+        for v in chosen:
+            mask |= self.bitmaps[facet].get(v, 0)
+        return mask
+
+    def match(self, selected: dict) -> int:
+        mask = self.all
+        for f, chosen in selected.items():
+            mask &= self._facet_mask(f, chosen)
+        return mask
+
+    def counts(self, selected: dict) -> dict:
+        """항목별 {값: 건수}. 각 항목의 건수는 그 항목 자신의 선택을 뺀 나머지 조건으로 계산."""
+        masks = {f: self._facet_mask(f, selected.get(f)) for f in self.facets}
+        out = {}
+        for f in self.facets:
+            others = self.all
+            for g, m in masks.items():
+                if g != f:
+                    others &= m
+            out[f] = {v: (bm & others).bit_count() for v, bm in self.bitmaps[f].items()}
+        return out
+
+    def rows(self, mask: int, limit: int | None = None) -> list[dict]:
+        out = []
+        while mask and (limit is None or len(out) < limit):
+            low = mask & -mask
+            i = low.bit_length() - 1
+            out.append(self.skus[i])
+            mask ^= low
+        return out
+
+
+def catalog_index(brand: str = DEFAULT_BRAND) -> FacetIndex:
+    # 샤드와 같이 오래 쓰지 않으면 캐시에서 빠지고, 샤드를 다시 만들면 새로 만듦
+    return catalog_store.cached(("facets", brand), lambda: FacetIndex(iter_skus(catalog_store.rows(brand))))
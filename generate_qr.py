@@ -1,21 +1,142 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
 import qrcode
+from PIL import Image, ImageDraw, ImageFont
+
+from catalog import iter_skus, deep_link
+from catalog_store import store as catalog_store, DEFAULT_BRAND
+from certificate import korean_font_paths
 
 # QR 코드에 넣을 URL
 url = "https://kd-boiler-checker-63jr3mw5k8dxjkj22mvtzy.streamlit.app/"
 
-# QR 코드 생성
-qr = qrcode.QRCode(
+# QR 설정 (바꾸면 모든 라벨이 다시 생성되도록 지문에 포함)
+QR_SETTINGS = dict(
     version=1,
     error_correction=qrcode.constants.ERROR_CORRECT_L,
     box_size=10,
     border=4,
 )
-qr.add_data(url)
-qr.make(fit=True)
+LABEL_VERSION = 1
+MANIFEST = "manifest.json"
+
+
+def make_qr_image(data: str) -> Image.Image:
+    qr = qrcode.QRCode(**QR_SETTINGS)
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr.make_image(fill_color="black", back_color="white").convert("RGB")
+
+
+# ────────────────────────────────────────────────
+# 모델별 QR 라벨 (일괄 생성)
+# ────────────────────────────────────────────────
+def label_name(brand: str, sku: dict) -> str:
+    raw = f"{brand}_{sku['구분']}_{sku['세부구분']}_{sku['모델명']}_{sku['용량']}_{sku['연료']}_{sku['급배기방식']}"
+    return re.sub(r'[\\/*?:"<>|() ]', "_", raw) + ".png"
+
+
+def label_caption(brand: str, sku: dict, font_path: str | None = None) -> str:
+    """라벨 아래 문구. 기본 제조사가 아니면 앞에 제조사명을 붙임."""
+    text = f"{sku['모델명']}-{sku['용량']} {sku['연료']} {sku['급배기방식']}"
+    if brand == DEFAULT_BRAND:
+        return text
+    if font_path is None and not brand.isascii():
+        # 기본 폰트는 한글을 지원하지 않으므로 한글 폰트가 없으면 영문 항목만 표시
+        return text
+    return f"{brand} {text}"
+
+
+def fingerprint(link: str, caption: str, font_path: str | None = None) -> str:
+    raw = json.dumps([LABEL_VERSION, QR_SETTINGS, link, caption, font_path], sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def render_label(job: tuple) -> str:
+    path, link, caption, font_path = job
+    qr_img = make_qr_image(link)
+    font = ImageFont.truetype(font_path, 12) if font_path else ImageFont.load_default()
+    label = Image.new("RGB", (qr_img.width, qr_img.height + 24), "white")
+    label.paste(qr_img, (0, 0))
+    draw = ImageDraw.Draw(label)
+    text_w = draw.textlength(caption, font=font)
+    draw.text(((label.width - text_w) / 2, qr_img.height + 4), caption, fill="black", font=font)
+    label.save(path)
+    return path
+
+
+def generate_batch(out_dir: str, base_url: str = url, workers: int | None = None, force: bool = False):
+    """카탈로그 샤드의 모든 제조사·SKU 에 대해 딥링크 QR 라벨을 만든다. 바뀌지 않은 라벨은 건너뜀."""
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifest = {}
+
+    font_path = next(korean_font_paths(), None)
+    brands = catalog_store.brands()
+    if font_path is None and not all(b.isascii() for b in brands if b != DEFAULT_BRAND):
+        print("Warning: Korean font not found. 한글 제조사명은 라벨 문구에서 빠집니다.")
+
+    new_manifest, jobs = {}, []
+    for brand in brands:
+        # 제조사 하나씩 (그 제조사의 샤드만 읽음)
+        for sku in iter_skus(catalog_store.rows(brand)):
+            name = label_name(brand, sku)
+            link, caption = deep_link(base_url, sku, brand), label_caption(brand, sku, font_path)
+            fp = fingerprint(link, caption, font_path)
+            new_manifest[name] = fp
+            path = os.path.join(out_dir, name)
+            if force or manifest.get(name) != fp or not os.path.exists(path):
+                jobs.append((path, link, caption, font_path))
+
+    # 카탈로그에서 빠진 SKU 의 라벨 삭제
+    stale = [name for name in manifest if name not in new_manifest]
+    for name in stale:
+        try:
+            os.remove(os.path.join(out_dir, name))
+        except FileNotFoundError:
+            pass
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for _ in pool.map(render_label, jobs, chunksize=max(1, len(jobs) // 64)):
+                pass
+
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(new_manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+    skipped = len(new_manifest) - len(jobs)
+    print(f"QR 라벨 {len(jobs)}개 생성, {skipped}개 변경 없음(건너뜀), {len(stale)}개 삭제 → '{out_dir}'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="경동나비엔 급배기전환 확인 프로그램 QR 코드 생성")
+    parser.add_argument("--batch", action="store_true", help="카탈로그의 모든 제조사·SKU 에 대해 딥링크 QR 라벨 생성")
+    parser.add_argument("--out", default="qr_labels", help="라벨 저장 폴더 (--batch)")
+    parser.add_argument("--base-url", default=url, help="앱 주소")
+    parser.add_argument("--workers", type=int, default=None, help="병렬 프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--force", action="store_true", help="변경 여부와 관계없이 모두 다시 생성")
+    args = parser.parse_args()
+
+    if args.batch:
+        generate_batch(args.out, args.base_url, args.workers, args.force)
+        return
+
+    # QR 코드 이미지 생성
+    qr_image = make_qr_image(args.base_url)
+
+    # 이미지 저장
+    qr_image.save("kd-boiler-qr.png")
+    print("QR 코드가 생성되었습니다. 'kd-boiler-qr.png' 파일을 확인해주세요.")
 
-# QR 코드 이미지 생성
-qr_image = qr.make_image(fill_color="black", back_color="white")
 
-# 이미지 저장
-qr_image.save("kd-boiler-qr.png")
-print("QR 코드가 생성되었습니다. 'kd-boiler-qr.png' 파일을 확인해주세요.") 
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""장시간 부하 테스트(soak_test.py)용 파이썬 힙 추적.
+
+KD_TRACEMALLOC 을 지정한 경우에만 프로세스 시작 시 tracemalloc 을 켜고, 지표 서버(KD_METRICS_PORT)에
+    /metrics               kd_heap_traced_bytes, kd_gc_objects 게이지 추가 (gc 후 값)
+    /debug/heap/baseline   gc 후 기준 스냅숏 저장
+    /debug/heap/top?n=20   기준 이후 가장 많이 늘어난 할당 위치 (증가 bytes, 증가 개수, 파일:줄 — 탭 구분)
+를 노출합니다. tracemalloc 은 모든 할당에 비용이 들므로 운영 서버에서는 지정하지 않습니다.
+
+환경변수
+    KD_TRACEMALLOC   할당 위치마다 기록할 스택 깊이 (예: 1). 지정한 경우에만 켜짐
+"""
+import gc
+import os
+import threading
+import tracemalloc
+from urllib.parse import parse_qs, urlsplit
+
+_lock = threading.Lock()
+_baseline = None
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    gc.collect()
+    return tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+
+
+def prometheus_text() -> str:
+    if not tracemalloc.is_tracing():
+        return ""
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    lines = [
+        "# TYPE kd_heap_traced_bytes gauge", f"kd_heap_traced_bytes {current}",
+        "# TYPE kd_heap_traced_peak_bytes gauge", f"kd_heap_traced_peak_bytes {peak}",
+        "# TYPE kd_gc_objects gauge", f"kd_gc_objects {len(gc.get_objects())}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def handle(path: str) -> str | None:
+    """/debug/heap/… 요청의 응답 본문. 추적 중이 아니거나 모르는 경로면 None."""
+    global _baseline
+    url = urlsplit(path)
+    if not tracemalloc.is_tracing():
+        return None
+    if url.path == "/debug/heap/baseline":
+        with _lock:
+            _baseline = _snapshot()
+        return "ok\n"
+    if url.path == "/debug/heap/top":
+        n = int(parse_qs(url.query).get("n", ["10"])[0])
+        with _lock:
+            if _baseline is None:
+                return ""
+            diff = _snapshot().compare_to(_baseline, "lineno")
+        growing = [d for d in diff if d.size_diff > 0][:n]
+        return "".join(
+            f"{d.size_diff}\t{d.count_diff}\t{d.traceback[0].filename}:{d.traceback[0].lineno}\n" for d in growing
+        )
+    return None
+
+
+# 프로세스당 한 번 (모듈은 프로세스에서 한 번만 import 됨)
+if os.environ.get("KD_TRACEMALLOC") and not tracemalloc.is_tracing():
+    tracemalloc.start(int(os.environ["KD_TRACEMALLOC"]))
@@ -0,0 +1,261 @@
+"""다운로드 파일(DOCX/PDF)을 디스크에 저장하는 Streamlit 미디어 저장소.
+
+기본 Streamlit 은 st.download_button 의 데이터를 세션이 끝날 때까지 메모리에 보관합니다.
+이 저장소는
+  - 같은 내용은 한 번만 저장하고 (SHA-256 내용 주소),
+  - 다운로드 요청이 올 때만 디스크에서 읽어 보내며 (요청을 처리하는 동안만 메모리에 둠),
+  - 오래 쓰지 않은 파일은 TTL / 용량 한도(LRU)에 따라 삭제합니다.
+여러 워커·재시작한 프로세스가 같은 폴더를 쓰므로 마지막 사용 시각은 파일 수정 시각(os.utime)에 기록하고,
+TTL 정리 전에 다시 확인합니다. 다른 프로세스가 이미 지운 파일은 캐시에 없는 것으로 보고 다시 만듭니다.
+
+환경변수
+    KD_PAYLOAD_DIR        저장 폴더 (기본: 임시 폴더/kd-boiler-payloads)
+    KD_PAYLOAD_TTL        마지막 사용 후 보관 시간(초, 기본 3600)
+    KD_PAYLOAD_MAX_BYTES  전체 보관 용량 한도 (기본 512MB)
+"""
+import hashlib
+import mimetypes
+import os
+import tempfile
+import threading
+import time
+
+try:
+    from streamlit.runtime.media_file_storage import MediaFileStorage, MediaFileStorageError
+    from streamlit.runtime.memory_media_file_storage import get_extension_for_mimetype
+except ImportError:  # Streamlit 없이 (CLI/테스트) 사용하는 경우
+    MediaFileStorage = object
+    MediaFileStorageError = KeyError
+
+    def get_extension_for_mimetype(mimetype: str) -> str:
+        return mimetypes.guess_extension(mimetype) or ""
+
+MEDIA_ENDPOINT = "/media"
+SWEEP_INTERVAL = 60
+
+
+class DiskFile:
+    """MediaFileHandler 가 사용하는 MemoryFile 과 같은 속성. content 는 요청 시 디스크에서 읽음."""
+
+    def __init__(self, path, size, mimetype, kind, filename):
+        self.path = path
+        self.content_size = size
+        self.mimetype = mimetype
+        self.kind = kind
+        self.filename = filename
+
+    @property
+    def content(self) -> bytes:
+        with open(self.path, "rb") as f:
+            return f.read()
+
+
+class DiskPayloadStore(MediaFileStorage):
+    def __init__(self, root: str, ttl: float = 3600, max_bytes: int = 512 * 1024 * 1024,
+                 media_endpoint: str = MEDIA_ENDPOINT):
+        self.root = root
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._media_endpoint = media_endpoint
+        self._lock = threading.Lock()
+        self._files = {}    # file_id → (digest, mimetype, kind, filename)
+        self._blobs = {}    # digest → [size, last_access]
+        self._total = 0
+        self._last_sweep = 0.0
+        os.makedirs(root, exist_ok=True)
+        self._scan()
+
+    # ── 내용 주소 저장 ──
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    def _touch(self, digest: str, now: float) -> bool:
+        """파일의 수정 시각을 마지막 사용 시각으로 (다른 프로세스의 정리에서 보이도록). 파일이 없으면 False."""
+        try:
+            os.utime(self._blob_path(digest), (now, now))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _forget(self, digest: str):
+        # 다른 프로세스가 지운 파일: 이 프로세스의 목록에서도 뺌. 잠금을 잡은 상태에서 호출
+        blob = self._blobs.pop(digest, None)
+        if blob is not None:
+            self._total -= blob[0]
+        for file_id in [f for f, meta in self._files.items() if meta[0] == digest]:
+            del self._files[file_id]
+
+    def _scan(self):
+        # 재시작 후에도 기존 파일을 재사용 (TTL 은 파일 수정 시각 = 마지막 사용 시각 기준)
+        for sub in os.listdir(self.root):
+            subdir = os.path.join(self.root, sub)
+            if not os.path.isdir(subdir):
+                continue
+            for name in os.listdir(subdir):
+                if name.endswith(".tmp"):
+                    continue
+                try:
+                    st = os.stat(os.path.join(subdir, name))
+                except FileNotFoundError:
+                    continue
+                self._blobs[name] = [st.st_size, st.st_mtime]
+                self._total += st.st_size
+
+    def put_bytes(self, data: bytes) -> str:
+        """data 를 저장하고 내용 해시(digest)를 돌려준다. 같은 내용은 다시 쓰지 않음."""
+        digest = hashlib.sha256(data).hexdigest()
+        now = time.time()
+        with self._lock:
+            blob = self._blobs.get(digest)
+            if blob is not None:
+                blob[1] = now
+        if blob is None or not self._touch(digest, now):
+            path = self._blob_path(digest)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+            with self._lock:
+                if digest not in self._blobs:
+                    self._blobs[digest] = [len(data), now]
+                    self._total += len(data)
+        self._maybe_sweep(now)
+        return digest
+
+    def __contains__(self, digest: str) -> bool:
+        with self._lock:
+            if digest not in self._blobs:
+                return False
+            if os.path.exists(self._blob_path(digest)):
+                return True
+            self._forget(digest)
+            return False
+
+    def get_bytes(self, digest: str) -> bytes:
+        """저장된 내용. 없거나 다른 프로세스가 지웠으면 KeyError (호출한 쪽에서 다시 만듦)."""
+        now = time.time()
+        with self._lock:
+            blob = self._blobs.get(digest)
+            if blob is None:
+                raise KeyError(digest)
+            blob[1] = now
+        try:
+            self._touch(digest, now)
+            with open(self._blob_path(digest), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self._forget(digest)
+            raise KeyError(digest) from None
+
+    # ── Streamlit MediaFileStorage ──
+    def load_and_get_id(self, path_or_data, mimetype, kind, filename=None) -> str:
+        if isinstance(path_or_data, str):
+            with open(path_or_data, "rb") as f:
+                path_or_data = f.read()
+        digest = self.put_bytes(path_or_data)
+        file_id = hashlib.sha224(f"{digest}|{mimetype}|{filename}".encode()).hexdigest()
+        with self._lock:
+            self._files[file_id] = (digest, mimetype, kind, filename)
+        return file_id
+
+    def get_file(self, filename: str) -> DiskFile:
+        file_id = os.path.splitext(filename)[0]
+        with self._lock:
+            meta = self._files.get(file_id)
+            blob = self._blobs.get(meta[0]) if meta else None
+            if blob is not None:
+                blob[1] = time.time()
+                if not self._touch(meta[0], blob[1]):
+                    self._forget(meta[0])
+                    blob = None
+            if blob is None:
+                raise MediaFileStorageError(f"Bad filename '{filename}'. (No media file with id '{file_id}')")
+        digest, mimetype, kind, name = meta
+        return DiskFile(self._blob_path(digest), blob[0], mimetype, kind, name)
+
+    def get_url(self, file_id: str) -> str:
+        with self._lock:
+            meta = self._files.get(file_id)
+        if meta is None:
+            raise MediaFileStorageError(f"Bad file_id '{file_id}'")
+        extension = get_extension_for_mimetype(meta[1])
+        return f"{self._media_endpoint}/{file_id}{extension}"
+
+    def delete_file(self, file_id: str) -> None:
+        # 참조만 지우고 실제 파일은 TTL / LRU 정리 때 삭제 (다른 세션이 같은 내용을 쓸 수 있음)
+        with self._lock:
+            self._files.pop(file_id, None)
+
+    # ── 정리 ──
+    def _maybe_sweep(self, now):
+        if now - self._last_sweep >= SWEEP_INTERVAL or self._total > self.max_bytes:
+            self.sweep(now)
+
+    def sweep(self, now: float | None = None):
+        now = now or time.time()
+        with self._lock:
+            self._last_sweep = now
+            # 다른 프로세스가 그 사이에 쓴 파일은 수정 시각이 새로우므로 남김
+            for d in [d for d, (_, last) in self._blobs.items() if now - last > self.ttl]:
+                try:
+                    self._blobs[d][1] = max(self._blobs[d][1], os.stat(self._blob_path(d)).st_mtime)
+                except FileNotFoundError:
+                    self._forget(d)
+            expired = [d for d, (_, last) in self._blobs.items() if now - last > self.ttl]
+            total = self._total - sum(self._blobs[d][0] for d in expired)
+            if total > self.max_bytes:
+                skip = set(expired)
+                rest = sorted((last, d) for d, (_, last) in self._blobs.items() if d not in skip)
+                for _, d in rest:
+                    if total <= self.max_bytes:
+                        break
+                    expired.append(d)
+                    total -= self._blobs[d][0]
+            for d in expired:
+                size, _ = self._blobs.pop(d)
+                self._total -= size
+            gone = set(expired)
+            for file_id in [f for f, meta in self._files.items() if meta[0] in gone]:
+                del self._files[file_id]
+        for d in expired:
+            try:
+                os.remove(self._blob_path(d))
+            except FileNotFoundError:
+                pass
+
+
+_install_failed = False
+
+
+def install(store: DiskPayloadStore) -> bool:
+    """실행 중인 Streamlit 서버의 미디어 저장소가 store 를 쓰도록 연결 (프로세스당 한 번).
+
+    서버의 /media 경로가 기존 저장소 객체를 직접 들고 있으므로 객체를 바꾸지 않고 메서드를 위임합니다.
+    Streamlit 내부 API 를 사용하므로 실패하면 기본 메모리 저장소를 그대로 사용합니다.
+    """
+    global _install_failed
+    if _install_failed:
+        return False
+    try:
+        from streamlit.runtime import Runtime
+        live = Runtime.instance().media_file_mgr._storage
+        if live is not store and getattr(live, "_kd_payload_store", None) is not store:
+            store._media_endpoint = getattr(live, "_media_endpoint", store._media_endpoint)
+            for name in ("load_and_get_id", "get_file", "get_url", "delete_file"):
+                setattr(live, name, getattr(store, name))
+            live._kd_payload_store = store
+    except Exception as e:
+        _install_failed = True
+        print(f"Warning: disk payload store not installed: {e}")
+        return False
+    return True
+
+
+# 프로세스당 하나 (모든 세션이 공유)
+store = DiskPayloadStore(
+    os.environ.get("KD_PAYLOAD_DIR") or os.path.join(tempfile.gettempdir(), "kd-boiler-payloads"),
+    ttl=float(os.environ.get("KD_PAYLOAD_TTL", "3600")),
+    max_bytes=int(os.environ.get("KD_PAYLOAD_MAX_BYTES", str(512 * 1024 * 1024))),
+)
@@ -0,0 +1,171 @@
+"""급배기방식 전환 작업자 명단 (성명·소속·작업자격·교육일자).
+
+명단 CSV 를 읽어 성명 기준 정렬 목록(앞글자 자동 완성, bisect)과 사전(정확히 일치)을 만듭니다.
+파일이 바뀌면 백그라운드 스레드에서 새 색인을 만든 뒤 통째로 교체하므로,
+다시 읽는 동안에도 세션은 기존 색인으로 바로 조회합니다.
+
+    python roster.py import 명단.csv      # 검사 후 KD_ROSTER_PATH 로 복사 (실행 중인 앱은 자동 반영)
+    python roster.py lookup 홍길          # 앞글자 조회 (조회 시간 표시)
+
+CSV 머리글: 성명, 소속, 작업자격, 교육일자  (name, affiliation, qualification, training_date 도 가능)
+"""
+import argparse
+import csv
+import os
+import shutil
+import sys
+import threading
+import time
+from bisect import bisect_left
+
+DATA_DIR = os.environ.get("KD_DATA_DIR", "data")
+ROSTER_PATH = os.environ.get("KD_ROSTER_PATH") or os.path.join(DATA_DIR, "roster.csv")
+CHECK_INTERVAL = 10      # 파일 변경 확인 주기(초)
+
+COLUMNS = {
+    "성명": "성명", "name": "성명",
+    "소속": "소속", "affiliation": "소속",
+    "작업자격": "작업자격", "qualification": "작업자격",
+    "교육일자": "교육일자", "training_date": "교육일자",
+}
+FIELDS = ("성명", "소속", "작업자격", "교육일자")
+
+
+def normalize(name: str) -> str:
+    return "".join(name.split()).casefold()
+
+
+def read_csv(path: str) -> list[tuple]:
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        header = [COLUMNS.get(h.strip()) for h in next(reader, [])]
+        missing = [c for c in ("성명", "소속", "작업자격") if c not in header]
+        if missing:
+            raise ValueError(f"명단 머리글에 {', '.join(missing)} 항목이 없습니다.")
+        pos = [header.index(c) if c in header else None for c in FIELDS]
+        rows = []
+        for line in reader:
+            rec = tuple(line[p].strip() if p is not None and p < len(line) else "" for p in pos)
+            if rec[0]:
+                rows.append(rec)
+        return rows
+
+
+class RosterSnapshot:
+    """읽기 전용 색인. 레코드는 (성명, 소속, 작업자격, 교육일자) 튜플."""
+
+    def __init__(self, rows: list[tuple], mtime: float = 0):
+        rows = sorted(rows, key=lambda r: normalize(r[0]))
+        self.mtime = mtime
+        self.records = rows
+        self.keys = [normalize(r[0]) for r in rows]
+        self.exact = {}
+        for i, k in enumerate(self.keys):
+            self.exact.setdefault(k, []).append(i)
+
+    def __len__(self):
+        return len(self.records)
+
+    def lookup(self, name: str) -> list[tuple]:
+        return [self.records[i] for i in self.exact.get(normalize(name), ())]
+
+    def complete(self, prefix: str, limit: int = 10) -> list[tuple]:
+        p = normalize(prefix)
+        if not p:
+            return []
+        out = []
+        i = bisect_left(self.keys, p)
+        while i < len(self.keys) and len(out) < limit and self.keys[i].startswith(p):
+            out.append(self.records[i])
+            i += 1
+        return out
+
+
+class Roster:
+    """현재 색인을 들고 있다가 파일이 바뀌면 백그라운드에서 교체."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.snapshot = RosterSnapshot([])
+        self.error = None
+        self._lock = threading.Lock()
+        self._loading = False
+        self._last_check = 0.0
+
+    def _mtime(self) -> float:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return 0
+
+    def refresh(self, wait: bool = False):
+        """파일이 바뀌었으면 다시 읽기 시작 (기본은 기다리지 않음)."""
+        now = time.monotonic()
+        with self._lock:
+            if self._loading or (not wait and now - self._last_check < CHECK_INTERVAL):
+                return
+            self._last_check = now
+            mtime = self._mtime()
+            if mtime == self.snapshot.mtime:
+                return
+            self._loading = True
+        t = threading.Thread(target=self._load, args=(mtime,), daemon=True)
+        t.start()
+        if wait:
+            t.join()
+
+    def _load(self, mtime):
+        try:
+            snapshot = RosterSnapshot(read_csv(self.path) if mtime else [], mtime)
+            self.snapshot, self.error = snapshot, None     # 참조 교체 한 번 (읽는 쪽은 잠금 불필요)
+        except Exception as e:
+            self.error = str(e)
+            print(f"Error loading roster {self.path}: {e}")
+        finally:
+            with self._lock:
+                self._loading = False
+
+    def lookup(self, name: str) -> list[tuple]:
+        self.refresh()
+        return self.snapshot.lookup(name)
+
+    def complete(self, prefix: str, limit: int = 10) -> list[tuple]:
+        self.refresh()
+        return self.snapshot.complete(prefix, limit)
+
+
+# 프로세스당 하나 (모든 세션이 공유)
+roster = Roster(ROSTER_PATH)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="급배기방식 전환 작업자 명단")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_imp = sub.add_parser("import", help="명단 CSV 를 검사한 뒤 앱이 읽는 위치로 복사")
+    p_imp.add_argument("csv")
+    p_look = sub.add_parser("lookup", help="성명 앞글자로 조회")
+    p_look.add_argument("prefix")
+    args = parser.parse_args()
+
+    if args.cmd == "import":
+        try:
+            rows = read_csv(args.csv)
+        except (OSError, ValueError) as e:
+            sys.exit(f"명단을 읽을 수 없습니다: {e}")
+        os.makedirs(os.path.dirname(ROSTER_PATH) or ".", exist_ok=True)
+        tmp = ROSTER_PATH + ".tmp"
+        shutil.copyfile(args.csv, tmp)
+        os.replace(tmp, ROSTER_PATH)
+        print(f"작업자 {len(rows):,}명을 '{ROSTER_PATH}' 로 가져왔습니다.")
+    else:
+        roster.refresh(wait=True)
+        start = time.perf_counter()
+        found = roster.snapshot.complete(args.prefix, limit=20)
+        elapsed = (time.perf_counter() - start) * 1000
+        for rec in found:
+            print("\t".join(rec))
+        print(f"({len(found)}건, {elapsed:.3f} ms, 명단 {len(roster.snapshot):,}명)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""장시간 부하(soak) 테스트 — 메모리 누수 확인.
+
+`streamlit run yoom_test.py` 서버를 별도 프로세스로 띄우고, 브라우저 탭처럼 /_stcore/stream 웹소켓으로 접속해
+QR 딥링크 → 판별 결과 → 확인서 입력 → 다운로드 → Word·PDF 저장(/media 로 실제 파일 받기) → 연결 종료
+흐름을 세션마다 새로 반복합니다. 서버 프로세스의 RSS(/proc/<pid>/status)와, 서버 안에서 켠 tracemalloc
+힙·gc 객체 수(heap_probe.py, KD_METRICS_PORT 의 /metrics)를 주기적으로 기록합니다.
+
+판정 기준은 "확인서 한 건당 몇 KB" 가 아니라 "준비 구간 이후 평탄한가" 입니다.
+서버가 확인서 한 건에 남기는 상태는 모두 한도나 만료가 있어야 합니다 (템플릿·미리보기·샤드 캐시는 개수/용량 한도,
+다운로드 파일은 KD_PAYLOAD_TTL, 끊긴 세션은 server.disconnectedSessionTTL).
+이 테스트는 두 만료 시간을 짧게 (--payload-ttl, --session-ttl) 서버를 띄우고, 캐시가 한도까지 차고(--warmup)
+만료 시간이 지난 뒤부터 끝까지
+늘어난 양(기울기 × 구간 길이)이 잡음 한도(--heap-tolerance-mb, --rss-tolerance-mb)를 넘으면 실패합니다.
+한도는 누수 크기가 아니라 gc 후 힙 / 할당자 RSS 의 흔들림 폭이므로, 세션 수를 늘릴수록 더 작은 누수가 잡힙니다
+(잡을 수 있는 한 건당 누수 ≈ 한도 / 준비 구간 이후 확인서 수). 실패하면 서버가 보고한 증가 할당 위치를 표시합니다.
+
+    python soak_test.py                          # 1000 세션
+    python soak_test.py --sessions 5000 --heap-tolerance-mb 0.5 --top 20
+
+저장 폴더(KD_DATA_DIR, KD_PAYLOAD_DIR)는 지정하지 않으면 임시 폴더를 사용합니다. Linux 전용 (/proc).
+"""
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+import uuid
+from urllib.parse import urlencode
+
+from websockets.sync.client import connect
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+APP = os.path.join(ROOT, "yoom_test.py")
+FORM_FIELDS = ("소속", "성명(서명)", "시공업체(상호)", "시공관리자")
+DOWNLOADS = {"📄 Word 파일 저장": b"PK", "📄 PDF 파일 저장": b"%PDF"}
+TIMEOUT = 120
+
+
+class SoakError(Exception):
+    pass
+
+
+# ────────────────────────────────────────────────
+# 서버 프로세스
+# ────────────────────────────────────────────────
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int, metrics_port: int, args, log) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        KD_PAYLOAD_TTL=str(args.payload_ttl),
+        KD_METRICS_PORT=str(metrics_port),
+    )
+    if not args.no_tracemalloc:
+        env["KD_TRACEMALLOC"] = "1"
+    cmd = [
+        sys.executable, "-m", "streamlit", "run", APP,
+        "--server.headless", "true",
+        "--server.port", str(port),
+        "--server.disconnectedSessionTTL", str(args.session_ttl),
+        "--server.fileWatcherType", "none",
+        "--browser.gatherUsageStats", "false",
+    ]
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + TIMEOUT
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SoakError(f"서버가 시작되지 않았습니다 (종료 코드 {proc.returncode}, 로그 {log.name}).")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=2):
+                return proc
+        except OSError:
+            time.sleep(0.5)
+    proc.kill()
+    raise SoakError("서버가 시간 안에 응답하지 않았습니다.")
+
+
+def server_rss(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    raise SoakError(f"/proc/{pid}/status 에 VmRSS 가 없습니다.")
+
+
+def server_metrics(metrics_port: int) -> dict:
+    with urllib.request.urlopen(f"http://127.0.0.1:{metrics_port}/metrics", timeout=TIMEOUT) as r:
+        text = r.read().decode()
+    return {k: float(v) for k, v in (line.split() for line in text.splitlines() if line and not line.startswith("#"))}
+
+
+def server_debug(metrics_port: int, path: str) -> str:
+    with urllib.request.urlopen(f"http://127.0.0.1:{metrics_port}{path}", timeout=TIMEOUT) as r:
+        return r.read().decode()
+
+
+# ────────────────────────────────────────────────
+# 웹소켓 세션 (브라우저 탭 하나)
+# ────────────────────────────────────────────────
+class Session:
+    """브라우저가 보내는 것과 같은 BackMsg 로 앱을 실행하고, 화면의 위젯을 (종류, 라벨) 로 찾는다."""
+
+    def __init__(self, ws, port: int, query: str):
+        self.ws = ws
+        self.base = f"http://127.0.0.1:{port}"
+        self.query = query
+        self.session_id = None
+        self.widgets = {}      # (종류, 라벨) → 위젯 proto
+        self.values = {}       # 위젯 id → 입력한 값 (WidgetState)
+
+    def _recv(self) -> ForwardMsg:
+        msg = ForwardMsg()
+        msg.ParseFromString(self.ws.recv(timeout=TIMEOUT))
+        return msg
+
+    def rerun(self, trigger: str | None = None):
+        back = BackMsg()
+        state = back.rerun_script
+        state.query_string = self.query
+        for value in self.values.values():
+            state.widget_states.widgets.append(value)
+        if trigger:
+            w = state.widget_states.widgets.add()
+            w.id = trigger
+            w.trigger_value = True
+        self.ws.send(back.SerializeToString())
+
+        self.widgets = {}
+        while True:
+            msg = self._recv()
+            kind = msg.WhichOneof("type")
+            if kind == "new_session":
+                self.session_id = msg.new_session.initialize.session_id
+                self.widgets = {}      # st.rerun() 으로 다시 시작한 실행
+            elif kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                el = msg.delta.new_element
+                el_kind = el.WhichOneof("type")
+                if el_kind == "exception":
+                    raise SoakError(f"앱 예외: {el.exception.message}")
+                proto = getattr(el, el_kind)
+                label = getattr(proto, "label", None)
+                if label is not None:
+                    self.widgets[el_kind, label] = proto
+            elif kind == "script_finished":
+                if msg.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise SoakError("앱 스크립트 컴파일 오류")
+                if msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    return
+
+    def widget(self, kind: str, label: str):
+        proto = self.widgets.get((kind, label))
+        if proto is None:
+            raise SoakError(f"'{label}' {kind} 이(가) 화면에 없습니다.")
+        return proto
+
+    def click(self, label: str):
+        button = self.widget("button", label)
+        if button.disabled:
+            raise SoakError(f"'{label}' 버튼이 비활성 상태입니다.")
+        self.rerun(trigger=button.id)
+
+    def set_text(self, label: str, value: str):
+        w = BackMsg().rerun_script.widget_states.widgets.add()
+        w.id = self.widget("text_input", label).id
+        w.string_value = value
+        self.values[w.id] = w
+
+    def download(self, label: str) -> bytes:
+        """저장 버튼 클릭: 서버에 파일 URL 을 요청(deferred download)하고 /media 에서 받는다."""
+        button = self.widget("download_button", label)
+        if button.deferred_file_id:
+            back = BackMsg()
+            req = back.backend_operation_request
+            req.request_id = str(uuid.uuid4())
+            req.session_id = self.session_id
+            req.deferred_file.file_id = button.deferred_file_id
+            self.ws.send(back.SerializeToString())
+            while True:
+                msg = self._recv()
+                if msg.WhichOneof("type") == "backend_operation_response" \
+                        and msg.backend_operation_response.request_id == req.request_id:
+                    break
+            resp = msg.backend_operation_response
+            if resp.error_msg:
+                raise SoakError(f"'{label}' 파일 요청 실패: {resp.error_msg}")
+            url = resp.deferred_file.url
+        else:
+            url = button.url
+        with urllib.request.urlopen(self.base + url, timeout=TIMEOUT) as r:
+            return r.read()
+
+
+def run_session(port: int, brand: str, sku: dict, n: int):
+    """한 세션: 딥링크 → form → 다운로드 → Word·PDF 저장 → 연결 종료. 파일을 받지 못하면 SoakError."""
+    from catalog import DEEP_LINK_PARAMS
+
+    query = urlencode(dict({"brand": brand}, **{p: sku[k] for k, p in DEEP_LINK_PARAMS.items()}))
+    # with 블록이 끝나면 탭을 닫은 것과 같이 연결 종료 → 서버는 server.disconnectedSessionTTL 뒤 세션 정리
+    with connect(f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"],
+                 max_size=None, open_timeout=TIMEOUT) as ws:
+        session = Session(ws, port, query)
+        session.rerun()
+        session.click("연소기 변경 확인서 (급배기방식 전환)")
+        for label in FORM_FIELDS:
+            session.set_text(label, f"{label}{n % 997}")
+        session.rerun()
+        session.click("연소기 변경 확인서 다운로드")
+        for label, magic in DOWNLOADS.items():
+            body = session.download(label)
+            if not body.startswith(magic):
+                raise SoakError(f"'{label}' 로 받은 파일이 올바르지 않습니다 ({len(body)} bytes).")
+
+
+def slope(points: list[tuple]) -> float:
+    """최소제곱 기울기 (y / x)."""
+    n = len(points)
+    if n < 2:
+        return 0.0
+    mx = sum(x for x, _ in points) / n
+    my = sum(y for _, y in points) / n
+    var = sum((x - mx) ** 2 for x, _ in points)
+    return sum((x - mx) * (y - my) for x, y in points) / var if var else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="서버를 띄워 전체 흐름 반복 실행 + 메모리 누수 확인")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=300,
+                        help="준비 구간 세션 수. 가장 큰 개수 한도 캐시(미리보기 256개, 세션당 1~2개)가 찰 때까지")
+    parser.add_argument("--sample-every", type=int, default=25)
+    parser.add_argument("--payload-ttl", type=float, default=30, help="서버의 KD_PAYLOAD_TTL (초)")
+    parser.add_argument("--session-ttl", type=int, default=5, help="서버의 server.disconnectedSessionTTL (초)")
+    parser.add_argument("--heap-tolerance-mb", type=float, default=1.0,
+                        help="준비 구간 이후 파이썬 힙(gc 후) 증가 허용폭 (MB)")
+    parser.add_argument("--rss-tolerance-mb", type=float, default=16.0,
+                        help="준비 구간 이후 서버 RSS 증가 허용폭 (MB, 할당자 단편화 포함)")
+    parser.add_argument("--top", type=int, default=10, help="보고할 증가 할당 위치 수")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="서버 힙 추적 끔 (RSS 만 확인)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if args.warmup >= args.sessions:
+        parser.error("--warmup 은 --sessions 보다 작아야 합니다.")
+
+    tmp = tempfile.mkdtemp(prefix="kd-soak-")
+    os.environ.setdefault("KD_DATA_DIR", os.path.join(tmp, "data"))
+    os.environ.setdefault("KD_PAYLOAD_DIR", os.path.join(tmp, "payloads"))
+    print(f"저장 폴더: {os.environ['KD_DATA_DIR']}, {os.environ['KD_PAYLOAD_DIR']}")
+
+    from catalog import iter_skus
+    from catalog_store import store as catalog_store    # 서버와 같은 샤드 (KD_DATA_DIR 지정 후 import)
+
+    skus = [(b, s) for b in catalog_store.brands() for s in iter_skus(catalog_store.rows(b))
+            if "전환가능" in s["전환여부"]]
+    rng = random.Random(args.seed)
+
+    trace = not args.no_tracemalloc
+    port, metrics_port = free_port(), free_port()
+    log = open(os.path.join(tmp, "server.log"), "w")
+    server = None
+    samples = []          # (확인서 수, rss, heap, objects)
+    warm_at = None        # 준비 구간이 끝난 확인서 수
+    settle = max(args.payload_ttl, args.session_ttl)
+    n = 0
+    try:
+        server = start_server(port, metrics_port, args, log)
+        print(f"서버 pid {server.pid}, 포트 {port} (로그 {log.name})")
+        started = time.monotonic()
+        print(f"{'certs':>6} {'RSS MB':>8} {'heap MB':>8} {'objects':>9} {'sec':>7}")
+        for n in range(1, args.sessions + 1):
+            run_session(port, *rng.choice(skus), n)
+            if warm_at is None and n >= args.warmup and time.monotonic() - started > settle:
+                warm_at = n
+                if trace:
+                    server_debug(metrics_port, "/debug/heap/baseline")
+            if n % args.sample_every == 0 or n == args.sessions:
+                m = server_metrics(metrics_port)
+                samples.append((n, server_rss(server.pid), m.get("kd_heap_traced_bytes", 0), m.get("kd_gc_objects", 0)))
+                print(f"{n:>6} {samples[-1][1] / 2**20:>8.1f} {samples[-1][2] / 2**20:>8.1f} "
+                      f"{samples[-1][3]:>9,.0f} {time.monotonic() - started:>7.0f}", flush=True)
+        if warm_at is None:
+            raise SoakError(f"만료 시간({settle:.0f}초)이 지나기 전에 세션이 끝났습니다. --sessions 를 늘려주세요.")
+
+        # 준비 구간 이후 증가량 (기울기 × 구간 길이; 기준 스냅숏을 뜬 시점의 표본은 제외)
+        steady = [s for s in samples if s[0] > warm_at]
+        span = steady[-1][0] - steady[0][0] if steady else 0
+        rss = slope([(s[0], s[1]) for s in steady])
+        heap = slope([(s[0], s[2]) for s in steady])
+        objects = slope([(s[0], s[3]) for s in steady])
+        print(f"\n세션 {warm_at} 이후 {span}건 동안 증가: RSS {rss * span / 2**20:.2f} MB, 힙 {heap * span / 2**20:.2f} MB, "
+              f"객체 {objects * span:,.0f}개  (한 건당 RSS {rss / 1024:.2f} KB, 힙 {heap / 1024:.2f} KB)")
+
+        failures = []
+        if rss * span / 2**20 > args.rss_tolerance_mb:
+            failures.append(f"RSS {rss * span / 2**20:.2f} MB 증가 > {args.rss_tolerance_mb} MB")
+        if trace and heap * span / 2**20 > args.heap_tolerance_mb:
+            failures.append(f"힙 {heap * span / 2**20:.2f} MB 증가 > {args.heap_tolerance_mb} MB")
+
+        if trace:
+            growing = [line.split("\t") for line in server_debug(metrics_port, f"/debug/heap/top?n={args.top}").splitlines()]
+            print(f"\n증가한 할당 위치 (세션 {warm_at} 이후 상위 {len(growing)}곳)")
+            for size, count, where in growing:
+                print(f"  {int(size) / 1024:>9.1f} KB  {int(count):>+8,}개  {where}")
+    except (SoakError, OSError) as e:
+        sys.exit(f"FAIL 세션 {n}: {e}")
+    finally:
+        if server is not None:
+            server.terminate()
+            try:
+                server.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                server.kill()
+        log.close()
+
+    for f in failures:
+        print(f"FAIL {f}")
+    if not failures:
+        print("OK")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""판별 / 확인서 발급 통계.
+
+이벤트 원본은 저장하지 않고, 이벤트마다 (일자, 제조사, 모델명, 연료, 급배기방식[, 시공업체]) 단위
+집계 행의 카운터만 증가시킵니다. 통계 화면은 이 집계 행만 읽으므로
+누적 이벤트 수와 관계없이 조회 비용이 일정합니다.
+
+저장 위치: KD_DATA_DIR/stats.sqlite3
+
+환경변수
+    KD_STATS_TOKEN   통계 화면(?stats=<토큰>) 접근 토큰. 지정하지 않으면 통계 화면을 열지 않음
+"""
+import hmac
+import os
+import sqlite3
+import threading
+from datetime import date
+
+from catalog_store import DEFAULT_BRAND
+
+DATA_DIR = os.environ.get("KD_DATA_DIR", "data")
+STATS_TOKEN = os.environ.get("KD_STATS_TOKEN", "")
+
+TABLES = {
+    "verdict_counts": """
+CREATE TABLE IF NOT EXISTS verdict_counts (
+    day TEXT NOT NULL, brand TEXT NOT NULL, model TEXT NOT NULL, fuel TEXT NOT NULL, exhaust TEXT NOT NULL,
+    checks INTEGER NOT NULL DEFAULT 0, rejected INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, brand, model, fuel, exhaust)
+)""",
+    "certificate_counts": """
+CREATE TABLE IF NOT EXISTS certificate_counts (
+    day TEXT NOT NULL, brand TEXT NOT NULL, model TEXT NOT NULL, fuel TEXT NOT NULL, exhaust TEXT NOT NULL,
+    company TEXT NOT NULL, issued INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, brand, model, fuel, exhaust, company)
+)""",
+}
+
+# 제조사 항목이 없던 집계 행은 기본 제조사로 옮김 (이미 있는 행에는 더함)
+MIGRATIONS = {
+    "verdict_counts": (
+        "day, ?, model, fuel, exhaust, checks, rejected",
+        "(day, brand, model, fuel, exhaust) DO UPDATE SET"
+        " checks = checks + excluded.checks, rejected = rejected + excluded.rejected",
+    ),
+    "certificate_counts": (
+        "day, ?, model, fuel, exhaust, company, issued",
+        "(day, brand, model, fuel, exhaust, company) DO UPDATE SET issued = issued + excluded.issued",
+    ),
+}
+VERDICT_GROUPS = ("day", "brand", "model", "fuel", "exhaust")
+CERTIFICATE_GROUPS = VERDICT_GROUPS + ("company",)
+
+
+class StatsStore:
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._migrate()
+        for create in TABLES.values():
+            self._db.execute(create)
+        self._db.commit()
+
+    def _has_table(self, name: str) -> bool:
+        return self._db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone() is not None
+
+    def _migrate(self):
+        # 테이블마다 한 트랜잭션 (도중에 끝나면 통째로 되돌아감).
+        # 이전 버전이 남긴 <table>_old 가 있으면 이어서 옮김
+        for table, (columns, merge) in MIGRATIONS.items():
+            cols = [r[1] for r in self._db.execute(f"PRAGMA table_info({table})")]
+            leftover = self._has_table(f"{table}_old")
+            if not leftover and not (cols and "brand" not in cols):
+                continue
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                if not leftover:
+                    self._db.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+                self._db.execute(TABLES[table])
+                self._db.execute(
+                    f"INSERT INTO {table} SELECT {columns} FROM {table}_old WHERE true ON CONFLICT {merge}",
+                    (DEFAULT_BRAND,),
+                )
+                self._db.execute(f"DROP TABLE {table}_old")
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    # ── 기록 (이벤트당 UPSERT 한 번) ──
+    def record_verdict(self, model: str, fuel: str, exhaust: str, ok: bool, day: date | None = None,
+                       brand: str = DEFAULT_BRAND):
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO verdict_counts VALUES (?, ?, ?, ?, ?, 1, ?)"
+                " ON CONFLICT (day, brand, model, fuel, exhaust)"
+                " DO UPDATE SET checks = checks + 1, rejected = rejected + excluded.rejected",
+                ((day or date.today()).isoformat(), brand, model, fuel, exhaust, 0 if ok else 1),
+            )
+            self._db.commit()
+
+    def record_certificate(self, model: str, fuel: str, exhaust: str, company: str, day: date | None = None,
+                           brand: str = DEFAULT_BRAND):
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO certificate_counts VALUES (?, ?, ?, ?, ?, ?, 1)"
+                " ON CONFLICT (day, brand, model, fuel, exhaust, company) DO UPDATE SET issued = issued + 1",
+                ((day or date.today()).isoformat(), brand, model, fuel, exhaust, company.strip() or "(미입력)"),
+            )
+            self._db.commit()
+
+    # ── 조회 (집계 행만 읽음) ──
+    def _query(self, sql, params):
+        with self._lock:
+            cur = self._db.execute(sql, params)
+            cols = [c[0] for c in cur.description]
+            return [dict(zip(cols, row)) for row in cur.fetchall()]
+
+    def verdicts_by(self, group: str | tuple, start: date, end: date):
+        """group: day / brand / model / fuel / exhaust (또는 그 튜플, 예: ("brand", "model")) 별 판별 수·전환불가 수."""
+        cols = _group_columns(group, VERDICT_GROUPS)
+        return self._query(
+            f"SELECT {cols}, SUM(checks) AS checks, SUM(rejected) AS rejected FROM verdict_counts"
+            f" WHERE day BETWEEN ? AND ? GROUP BY {cols} ORDER BY checks DESC",
+            (start.isoformat(), end.isoformat()),
+        )
+
+    def certificates_by(self, group: str | tuple, start: date, end: date):
+        """group: day / brand / model / fuel / exhaust / company (또는 그 튜플) 별 확인서 발급 수."""
+        cols = _group_columns(group, CERTIFICATE_GROUPS)
+        return self._query(
+            f"SELECT {cols}, SUM(issued) AS issued FROM certificate_counts"
+            f" WHERE day BETWEEN ? AND ? GROUP BY {cols} ORDER BY issued DESC",
+            (start.isoformat(), end.isoformat()),
+        )
+
+
+def _group_columns(group, allowed) -> str:
+    # 열 이름은 SQL 에 그대로 들어가므로 허용 목록으로만
+    cols = (group,) if isinstance(group, str) else tuple(group)
+    if not cols or not all(c in allowed for c in cols):
+        raise ValueError(f"unknown stats group: {group!r}")
+    return ", ".join(cols)
+
+
+def stats_access_ok(token: str) -> bool:
+    """통계 화면 접근 토큰 확인. KD_STATS_TOKEN 이 없으면 항상 거절."""
+    return bool(STATS_TOKEN) and hmac.compare_digest(token.encode(), STATS_TOKEN.encode())
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_stats() -> StatsStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = StatsStore(os.path.join(DATA_DIR, "stats.sqlite3"))
+        return _store
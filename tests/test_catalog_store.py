@@ -0,0 +1,67 @@
+import json
+import time
+
+import catalog_store
+from catalog import find_sku, iter_skus
+from catalog_store import CatalogStore, DEFAULT_BRAND
+
+
+def _wait_for(predicate, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.2)
+    return False
+
+
+def test_builds_missing_shards_and_picks_up_source_edits(tmp_path, monkeypatch):
+    src = tmp_path / "src"
+    src.mkdir()
+    store = CatalogStore(str(tmp_path / "catalog"), source_dir=str(src))
+    assert store.brands() == [DEFAULT_BRAND]
+
+    monkeypatch.setattr(catalog_store, "CHECK_INTERVAL", 0)
+    row = {"구분": "가스보일러", "세부구분": "일반", "모델명": "X-1", "연료": "LNG", "급배기방식": "FF",
+           "용량": "20K", "비고": "", "전환여부": "전환가능"}
+    (src / "다른제조사.json").write_text(json.dumps([row], ensure_ascii=False), encoding="utf-8")
+    assert _wait_for(lambda: "다른제조사" in store.brands())
+    assert store.rows("다른제조사")[0]["모델명"] == "X-1"
+
+
+def test_derived_objects_are_evicted_like_shards(tmp_path):
+    catalog_store.build(str(tmp_path / "catalog"), str(tmp_path / "src"))
+    store = CatalogStore(str(tmp_path / "catalog"), max_shards=1, source_dir=str(tmp_path / "src"))
+    built = []
+
+    def make(key):
+        built.append(key)
+        return object()
+
+    first = store.cached("a", lambda: make("a"))
+    assert store.cached("a", lambda: make("a")) is first
+    store.cached("b", lambda: make("b"))
+    store.cached("a", lambda: make("a"))
+    assert built == ["a", "b", "a"]
+
+    store.idle = 0
+    time.sleep(0.01)
+    store.cached("a", lambda: make("a"))
+    assert built[-1] == "a" and len(built) == 4
+
+
+def test_shard_filters_on_codes_like_decoded_rows(tmp_path):
+    catalog_store.build(str(tmp_path / "catalog"), str(tmp_path / "src"))
+    store = CatalogStore(str(tmp_path / "catalog"), source_dir=str(tmp_path / "src"))
+    category = store.categories(DEFAULT_BRAND)[0]
+    shard = store.shard(DEFAULT_BRAND, category)
+    rows = shard.rows()
+
+    assert [shard.row(i) for i in range(len(shard))] == rows
+    sub = rows[-1]["세부구분"]
+    assert shard.distinct("모델명", {"세부구분": sub}) == list(dict.fromkeys(
+        r["모델명"] for r in rows if r["세부구분"] == sub))
+    assert shard.select({"세부구분": "없는값"}) == []
+    for sku in iter_skus(rows):
+        assert shard.find_sku(sku) == find_sku(sku, rows)
+    assert shard.find_sku(dict(sku, 용량="없는용량")) is None
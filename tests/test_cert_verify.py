@@ -0,0 +1,118 @@
+import base64
+import multiprocessing
+import os
+from datetime import date
+
+import pytest
+
+import cert_verify
+from cert_verify import CHANGED, FORGED, MALFORMED, UNKNOWN, VALID, IssuedIndex
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(cert_verify, "DATA_DIR", str(tmp_path))
+    monkeypatch.delenv("KD_CERT_SECRET", raising=False)
+    monkeypatch.setattr(cert_verify, "_index", None)
+    cert_verify._read_secret.cache_clear()
+    yield tmp_path
+    cert_verify._read_secret.cache_clear()
+
+
+def sample_info(**changes):
+    info = dict(
+        번호="NO.1", 연소기명="NCB354-15K (LNG, FF)", 수량=1, 변경일=date(2025, 1, 2),
+        작업자_소속="OO설비", 작업자_성명="홍길동", 작업자격="가스보일러 제조사의 A/S 종사자",
+        시공업체="OO설비", 시공관리자="김철수",
+    )
+    info.update(changes)
+    return info
+
+
+def test_issue_then_verify():
+    code = cert_verify.issue(sample_info())
+    result, fields = cert_verify.verify(code, sample_info())
+    assert result == VALID
+    assert fields["작업자_성명"] == "홍길동"
+    assert cert_verify.verify(cert_verify.verify_url(code))[0] == VALID
+
+
+def test_tampered_fields_are_changed():
+    code = cert_verify.issue(sample_info())
+    assert cert_verify.verify(code, sample_info(수량=2))[0] == CHANGED
+
+
+def test_tampered_units_are_changed():
+    units = [{"번호": "NO.1", "연소기명": "A", "수량": 1}, {"번호": "NO.2", "연소기명": "B", "수량": 1}]
+    code = cert_verify.issue(sample_info(units=units))
+    units[1] = dict(units[1], 수량=3)
+    assert cert_verify.verify(code, sample_info(units=units))[0] == CHANGED
+
+
+def test_forged_signature():
+    code = cert_verify.issue(sample_info())
+    cert_id, digest, sig = cert_verify.parse_code(code)
+    bad_sig = sig[:-1] + bytes([sig[-1] ^ 1])
+    forged = cert_verify.PREFIX + base64.urlsafe_b64encode(cert_id + digest + bad_sig).rstrip(b"=").decode()
+    assert cert_verify.verify(forged)[0] == FORGED
+
+
+def test_malformed_and_unknown():
+    assert cert_verify.verify("not a code")[0] == MALFORMED
+    code = cert_verify.issue(sample_info())
+    cert_verify._index = IssuedIndex(os.path.join(cert_verify.DATA_DIR, "other.sqlite3"))
+    assert cert_verify.verify(code)[0] == UNKNOWN
+
+
+def test_index_sees_codes_issued_by_another_index(data_dir):
+    path = str(data_dir / "issued.sqlite3")
+    reader = IssuedIndex(path)          # 다른 프로세스처럼 먼저 열어 둔 색인
+    writer = IssuedIndex(path)
+    digest = cert_verify.fields_digest(sample_info())
+    writer.add(b"12345678", digest, sample_info())
+    assert reader.lookup(b"12345678")[0] == digest
+    assert reader.lookup(b"87654321") is None
+
+
+def test_unknown_codes_do_not_query_sqlite_until_the_file_changes(data_dir):
+    index = IssuedIndex(str(data_dir / "issued.sqlite3"))
+    index.add(b"12345678", cert_verify.fields_digest(sample_info()), sample_info())
+    index.lookup(b"00000000")                # 자기 발급 뒤 한 번은 확인
+    before = index.catch_ups
+    for i in range(100):
+        assert index.lookup(i.to_bytes(8, "big")) is None
+    assert index.catch_ups == before and index.disk_lookups == 0
+
+
+def _issue_in_child(data_dir, queue):
+    cert_verify.DATA_DIR = data_dir
+    queue.put(cert_verify.issue(sample_info()))
+
+
+def test_verify_code_issued_by_another_process(data_dir):
+    cert_verify.get_index()             # 이 프로세스의 필터를 먼저 만든 뒤
+    queue = multiprocessing.get_context("fork").Queue()
+    child = multiprocessing.get_context("fork").Process(target=_issue_in_child, args=(str(data_dir), queue))
+    child.start()
+    code = queue.get(timeout=30)
+    child.join(30)
+    assert cert_verify.verify(code)[0] == VALID
+
+
+def _read_key(data_dir, queue):
+    cert_verify.DATA_DIR = data_dir
+    cert_verify._read_secret.cache_clear()
+    queue.put(cert_verify._secret())
+
+
+def test_secret_created_once_under_concurrent_start(data_dir):
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+    procs = [ctx.Process(target=_read_key, args=(str(data_dir), queue)) for _ in range(8)]
+    for p in procs:
+        p.start()
+    keys = {queue.get(timeout=30) for _ in procs}
+    for p in procs:
+        p.join(30)
+    assert len(keys) == 1
+    assert keys == {(data_dir / "cert_secret").read_bytes()}
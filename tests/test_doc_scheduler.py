@@ -0,0 +1,52 @@
+import threading
+import time
+
+import pytest
+
+from doc_scheduler import DocumentScheduler, SchedulerBusy, PRIORITY_BULK, PRIORITY_INTERACTIVE
+
+
+def _start(sched, results, name, priority, fn=lambda: "ok"):
+    def target():
+        try:
+            results[name] = sched.run(fn, priority=priority)
+        except SchedulerBusy:
+            results[name] = "busy"
+    t = threading.Thread(target=target)
+    t.start()
+    time.sleep(0.05)
+    return t
+
+
+def _wait_queued(sched, depth):
+    for _ in range(100):
+        if sched.snapshot()["queue_depth"] == depth:
+            return
+        time.sleep(0.01)
+    pytest.fail(f"queue depth never reached {depth}")
+
+
+def test_interactive_request_preempts_bulk_waiter_when_queue_full():
+    sched, results, gate = DocumentScheduler(workers=1, max_queue=2), {}, threading.Event()
+    threads = [_start(sched, results, "running", PRIORITY_BULK, gate.wait)]
+    threads += [_start(sched, results, f"bulk{i}", PRIORITY_BULK) for i in range(2)]
+    _wait_queued(sched, 2)
+    threads.append(_start(sched, results, "interactive", PRIORITY_INTERACTIVE))
+    _wait_queued(sched, 2)
+    gate.set()
+    for t in threads:
+        t.join(5)
+    assert results == {"running": True, "bulk0": "ok", "bulk1": "busy", "interactive": "ok"}
+    assert sched.snapshot()["rejected"] == 1
+
+
+def test_same_priority_rejected_when_queue_full():
+    sched, results, gate = DocumentScheduler(workers=1, max_queue=1), {}, threading.Event()
+    threads = [_start(sched, results, "running", PRIORITY_INTERACTIVE, gate.wait),
+               _start(sched, results, "queued", PRIORITY_INTERACTIVE)]
+    _wait_queued(sched, 1)
+    threads.append(_start(sched, results, "late", PRIORITY_INTERACTIVE))
+    gate.set()
+    for t in threads:
+        t.join(5)
+    assert results["late"] == "busy" and results["queued"] == "ok"
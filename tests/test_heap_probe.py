@@ -0,0 +1,25 @@
+import tracemalloc
+
+import heap_probe
+
+
+def test_reports_nothing_unless_tracing():
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    assert heap_probe.prometheus_text() == ""
+    assert heap_probe.handle("/debug/heap/top") is None
+
+
+def test_reports_growth_since_baseline():
+    tracemalloc.start(1)
+    try:
+        assert heap_probe.handle("/debug/heap/baseline") == "ok\n"
+        kept = [bytearray(1024) for _ in range(256)]
+        top = heap_probe.handle("/debug/heap/top?n=3").splitlines()
+        size, count, where = top[0].split("\t")
+        assert int(size) >= 256 * 1024 and "test_heap_probe.py" in where
+        assert "kd_heap_traced_bytes" in heap_probe.prometheus_text()
+        assert heap_probe.handle("/debug/heap/unknown") is None
+        del kept
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,28 @@
+import os
+import time
+
+import pytest
+
+from payload_store import DiskPayloadStore
+
+
+def test_blob_used_by_another_process_survives_sweep(tmp_path):
+    user = DiskPayloadStore(str(tmp_path), ttl=60)
+    digest = user.put_bytes(b"docx")
+    old = time.time() - 3600
+    os.utime(user._blob_path(digest), (old, old))
+
+    restarted = DiskPayloadStore(str(tmp_path), ttl=60)     # 다른 워커 / 재시작: 오래된 파일로 보임
+    assert user.get_bytes(digest) == b"docx"                # 사용 → 파일 수정 시각 갱신
+    restarted.sweep()
+    assert digest in user and user.get_bytes(digest) == b"docx"
+
+
+def test_blob_removed_elsewhere_is_a_cache_miss(tmp_path):
+    store = DiskPayloadStore(str(tmp_path))
+    digest = store.put_bytes(b"pdf")
+    os.remove(store._blob_path(digest))
+    assert digest not in store
+    with pytest.raises(KeyError):
+        store.get_bytes(digest)
+    assert store.get_bytes(store.put_bytes(b"pdf")) == b"pdf"
@@ -0,0 +1,54 @@
+import os
+import time
+
+import roster
+from roster import Roster, RosterSnapshot
+
+
+def _wait_for(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def _write(path, lines, mtime):
+    path.write_text("\n".join(["성명,소속,작업자격,교육일자"] + lines) + "\n", encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+def test_snapshot_prefix_and_exact_lookup():
+    snap = RosterSnapshot([
+        ("홍길동", "가나설비", "제조사 A/S", ""),
+        ("홍 길순", "다라설비", "교육 이수", "2024-01-02"),
+        ("김철수", "마바설비", "2년 이상", ""),
+        ("홍길동", "사아설비", "교육 이수", ""),
+    ])
+
+    assert [r[1] for r in snap.lookup(" 홍 길동")] == ["가나설비", "사아설비"]
+    assert snap.lookup("홍길") == []
+    assert {r[0] for r in snap.complete("홍길")} == {"홍길동", "홍 길순"}
+    assert len(snap.complete("홍", limit=2)) == 2
+    assert snap.complete("") == [] and snap.complete("이") == []
+
+
+def test_background_refresh_swaps_the_whole_snapshot(tmp_path, monkeypatch):
+    path = tmp_path / "roster.csv"
+    _write(path, ["홍길동,가나설비,제조사 A/S,"], 1_000_000)
+    r = Roster(str(path))
+    r.refresh(wait=True)
+    old = r.snapshot
+    assert [w[1] for w in r.lookup("홍길동")] == ["가나설비"]
+
+    monkeypatch.setattr(roster, "CHECK_INTERVAL", 0)
+    _write(path, ["홍길동,다라설비,교육 이수,", "김철수,마바설비,2년 이상,"], 2_000_000)
+    assert _wait_for(lambda: r.lookup("김철수"))
+    assert [w[1] for w in r.lookup("홍길동")] == ["다라설비"]
+    assert [w[1] for w in old.lookup("홍길동")] == ["가나설비"]      # 읽던 색인은 그대로
+
+    path.write_text("name\n이름만\n", encoding="utf-8")
+    os.utime(path, (3_000_000, 3_000_000))
+    assert _wait_for(lambda: r.lookup("김철수") and r.error is not None)
+    assert r.lookup("김철수")                                       # 잘못된 파일이면 기존 색인 유지
@@ -0,0 +1,65 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+import stats_store
+from stats_store import StatsStore
+
+DAY = date(2025, 1, 2)
+
+
+def test_same_model_name_from_different_brands_is_not_merged(tmp_path):
+    stats = StatsStore(str(tmp_path / "stats.sqlite3"))
+    stats.record_verdict("M1", "LNG", "FF", True, DAY, brand="A")
+    stats.record_verdict("M1", "LNG", "FF", False, DAY, brand="B")
+    stats.record_certificate("M1", "LNG", "FF", "OO설비", DAY, brand="A")
+    rows = {(r["brand"], r["model"]): r for r in stats.verdicts_by(("brand", "model"), DAY, DAY)}
+    assert rows[("A", "M1")]["rejected"] == 0 and rows[("B", "M1")]["rejected"] == 1
+    assert stats.verdicts_by("model", DAY, DAY)[0]["checks"] == 2
+    assert stats.certificates_by(("brand", "model"), DAY, DAY) == [{"brand": "A", "model": "M1", "issued": 1}]
+
+
+def test_counts_without_brand_are_migrated_to_default_brand(tmp_path):
+    path = str(tmp_path / "stats.sqlite3")
+    db = sqlite3.connect(path)
+    db.executescript("""
+        CREATE TABLE verdict_counts (day TEXT, model TEXT, fuel TEXT, exhaust TEXT, checks INTEGER, rejected INTEGER,
+                                     PRIMARY KEY (day, model, fuel, exhaust));
+        INSERT INTO verdict_counts VALUES ('2025-01-02', 'M1', 'LNG', 'FF', 3, 1);
+    """)
+    db.close()
+    stats = StatsStore(path)
+    stats.record_verdict("M1", "LNG", "FF", True, DAY)
+    assert stats.verdicts_by("brand", DAY, DAY) == [{"brand": "경동나비엔", "checks": 4, "rejected": 1}]
+
+
+def test_interrupted_migration_is_resumed(tmp_path):
+    path = str(tmp_path / "stats.sqlite3")
+    db = sqlite3.connect(path)
+    db.executescript("""
+        CREATE TABLE certificate_counts_old (day TEXT, model TEXT, fuel TEXT, exhaust TEXT, company TEXT, issued INTEGER,
+                                             PRIMARY KEY (day, model, fuel, exhaust, company));
+        INSERT INTO certificate_counts_old VALUES ('2025-01-02', 'M1', 'LNG', 'FF', 'OO설비', 2);
+        CREATE TABLE certificate_counts (day TEXT NOT NULL, brand TEXT NOT NULL, model TEXT NOT NULL, fuel TEXT NOT NULL,
+                                         exhaust TEXT NOT NULL, company TEXT NOT NULL, issued INTEGER NOT NULL DEFAULT 0,
+                                         PRIMARY KEY (day, brand, model, fuel, exhaust, company));
+        INSERT INTO certificate_counts VALUES ('2025-01-02', '경동나비엔', 'M1', 'LNG', 'FF', 'OO설비', 1);
+    """)
+    db.close()
+    stats = StatsStore(path)
+    assert stats.certificates_by("company", DAY, DAY) == [{"company": "OO설비", "issued": 3}]
+    assert not stats._has_table("certificate_counts_old")
+
+
+def test_unknown_group_column_is_rejected(tmp_path):
+    stats = StatsStore(str(tmp_path / "stats.sqlite3"))
+    with pytest.raises(ValueError):
+        stats.verdicts_by("model; DROP TABLE verdict_counts", DAY, DAY)
+
+
+def test_stats_page_needs_configured_token(monkeypatch):
+    monkeypatch.setattr(stats_store, "STATS_TOKEN", "")
+    assert not stats_store.stats_access_ok("")
+    monkeypatch.setattr(stats_store, "STATS_TOKEN", "s3cret")
+    assert stats_store.stats_access_ok("s3cret") and not stats_store.stats_access_ok("1")
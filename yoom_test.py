@@ -1,24 +1,22 @@
 import streamlit as st, pandas as pd
-from io import BytesIO
-from datetime import date, datetime
-from docx import Document
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.shared import Pt, Cm, Inches
+from datetime import date, datetime, timedelta
 from PIL import Image
 import re
+import html
 import base64
 import tempfile
 import os
-# from docx2pdf import convert # ModuleNotFoundError 해결을 위해 제거
 
-# PDF 생성을 위한 추가 라이브러리 (reportlab 관련)
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import mm
-from reportlab.pdfbase import pdfmetrics # make_pdf 함수 내부에 이미 import되어 있지만, 상단에 두어도 무방합니다.
-from reportlab.pdfbase.ttfonts import TTFont # make_pdf 함수 내부에 이미 import되어 있지만, 상단에 두어도 무방합니다.
+from catalog import DEEP_LINK_PARAMS, split_capacity
+from catalog_store import store as catalog_store, DEFAULT_BRAND
+from cert_verify import issue as issue_verify_code, verify as verify_certificate, VALID as VERIFY_VALID
+from certificate import make_docx, make_pdf, get_template, certificate_units
+from dealers import DEFAULT_DEALER_ID, get_dealer, list_dealers
+from facets import FACETS, catalog_index
+from doc_scheduler import scheduler as doc_scheduler, SchedulerBusy, PRIORITY_INTERACTIVE, PRIORITY_BULK
+from payload_store import store as payload_store, install as install_payload_store
+from roster import roster as worker_roster
+from stats_store import get_stats, stats_access_ok
 
 def get_base64_image(image_path):
     try:
@@ -55,6 +53,7 @@ def init_session_state():
         # 첫 페이지 (model) 저장값
         selected_qualification="",
         # 두 번째 페이지 (product) 저장값
+        selected_제조사=DEFAULT_BRAND,
         selected_구분="",
         selected_세부구분="",
         selected_모델명="",
@@ -66,11 +65,19 @@ def init_session_state():
         form_연소기명="",
         form_수량=1,
         form_변경일자=date.today(),
+        form_추가연소기="",      # NO.2 부터 (한 줄에 하나 : 연소기명, 수량)
         form_작업자_소속="",
         form_작업자_성명="",
         form_작업자격="가스보일러 제조사의 A/S 종사자",
         form_시공업체="",
-        form_시공관리자=""
+        form_시공관리자="",
+        download_info=None,      # 마지막으로 다운로드를 요청한 확인서 입력값
+        deep_link_applied=False, # QR 딥링크는 세션당 한 번만 적용
+        rendered_docs=None,      # 마지막으로 생성한 확인서 (DOCX/PDF)
+        dealer_id=None,          # 대리점 (?dealer=<ID> 또는 사이드바 선택)
+        dealer_defaults_applied=None,
+        roster_autofilled=None,  # 명단에서 마지막으로 자동 입력한 작업자
+        certificate_recorded=None,  # 발급 통계에 기록한 마지막 검증코드
     )
     for k, v in defaults.items():
         if k not in st.session_state:
@@ -79,482 +86,342 @@ def init_session_state():
 init_session_state()
 ss = st.session_state
 
+# 다운로드 파일은 메모리 대신 디스크(내용 주소 저장소)에 보관
+install_payload_store(payload_store)
+
+# 작업자 명단은 바뀌었을 때만 백그라운드에서 다시 읽음
+worker_roster.refresh()
+
+# 대리점 선택: URL 로 지정되면 고정, 아니면 사이드바에서 선택
+url_dealer = st.query_params.get("dealer")
+if url_dealer:
+    ss.dealer_id = url_dealer
+else:
+    dealer_ids = list_dealers()
+    if dealer_ids:
+        options = [DEFAULT_DEALER_ID] + dealer_ids
+        current = ss.dealer_id if ss.dealer_id in options else DEFAULT_DEALER_ID
+        ss.dealer_id = st.sidebar.selectbox(
+            "대리점", options, index=options.index(current),
+            format_func=lambda i: get_dealer(i)["name"],
+        )
+dealer = get_dealer(ss.dealer_id)
+
+# 대리점이 바뀌면 비어 있는 확인서 입력란에 대리점 기본값 채우기
+if ss.dealer_defaults_applied != dealer["id"]:
+    for k, v in dealer["defaults"].items():
+        if f"form_{k}" in ss and not ss[f"form_{k}"]:
+            ss[f"form_{k}"] = v
+    ss.dealer_defaults_applied = dealer["id"]
+
+# 확인서 QR 스캔 (?verify=<검증코드>) → 진위 확인 화면
+if "verify" in st.query_params:
+    st.title("연소기 변경 확인서 진위 확인")
+    result, fields = verify_certificate(st.query_params["verify"])
+    if result == VERIFY_VALID:
+        st.success(f"검증 결과 : {result}")
+    else:
+        st.error(f"검증 결과 : {result}")
+    if fields:
+        st.table(pd.DataFrame({"발급 내용": fields}))
+    st.stop()
+
+# 통계 화면 (?stats=<KD_STATS_TOKEN>) : 미리 집계된 카운터만 읽음
+if "stats" in st.query_params:
+    st.title("급배기전환 판별 / 확인서 발급 통계")
+    if not stats_access_ok(st.query_params["stats"]):
+        st.error("통계 화면에 접근할 수 없습니다. 관리자에게 받은 주소로 접속해주세요.")
+        st.stop()
+    d1, d2 = st.columns(2)
+    start = d1.date_input("시작일", value=date.today() - timedelta(days=30))
+    end = d2.date_input("종료일", value=date.today())
+    stats = get_stats()
+
+    st.markdown("### ■ 판별 현황")
+    by_day = pd.DataFrame(stats.verdicts_by("day", start, end))
+    if by_day.empty:
+        st.info("기간 내 판별 기록이 없습니다.")
+    else:
+        total, rejected = int(by_day.checks.sum()), int(by_day.rejected.sum())
+        m1, m2, m3 = st.columns(3)
+        m1.metric("판별 수", f"{total:,}")
+        m2.metric("전환불가", f"{rejected:,}")
+        m3.metric("전환불가 비율", f"{rejected / total * 100:.1f}%")
+        st.line_chart(by_day.sort_values("day").set_index("day").rename(columns={"checks": "판별", "rejected": "전환불가"}))
+
+        def verdict_table(group, label):
+            t = pd.DataFrame(stats.verdicts_by(group, start, end))
+            t["전환불가 비율(%)"] = (t.rejected / t.checks * 100).round(1)
+            column = group if isinstance(group, str) else group[-1]
+            return t.rename(columns={column: label, "checks": "판별 수", "rejected": "전환불가"})
+
+        st.dataframe(verdict_table(("brand", "model"), "모델명").rename(columns={"brand": "제조사"}), hide_index=True)
+        c1, c2 = st.columns(2)
+        c1.dataframe(verdict_table("fuel", "연료"), hide_index=True)
+        c2.dataframe(verdict_table("exhaust", "급배기방식"), hide_index=True)
+
+    st.markdown("### ■ 확인서 발급 현황")
+    by_company = pd.DataFrame(stats.certificates_by("company", start, end))
+    if by_company.empty:
+        st.info("기간 내 발급 기록이 없습니다.")
+    else:
+        c1, c2 = st.columns(2)
+        c1.dataframe(by_company.rename(columns={"company": "시공업체", "issued": "발급 수"}),
+                     hide_index=True)
+        c2.dataframe(pd.DataFrame(stats.certificates_by(("brand", "model"), start, end))
+                     .rename(columns={"brand": "제조사", "model": "모델명", "issued": "발급 수"}),
+                     hide_index=True)
+    st.stop()
+
 # ────────────────────────────────────────────────
 # 3) 보조 함수
 # ────────────────────────────────────────────────
-def capacity_ok(row, sel):
-    if row["용량"].strip() == "없음":
-        return sel == "없음"
-    return sel in [c.strip() for c in row["용량"].split(",")]
-
 def sanitize(name: str) -> str:          # ★ 파일명 안전 처리
     return re.sub(r'[\\/*?:"<>|]', "", name).strip() or "이름없음"
 
+def parse_units(text: str, start: int = 2) -> tuple[list[dict], list[str]]:
+    """'연소기명, 수량' 줄 목록 → (확인서 행 (NO.start 부터), 수량이 잘못된 줄).
 
-def make_docx(info: dict, sign_png: BytesIO | None) -> BytesIO:
-    doc = Document()
-    sec = doc.sections[0]
-    for m in ("top_margin", "bottom_margin", "left_margin", "right_margin"):
-        setattr(sec, m, Pt(35))
-
-    # 제목
-    doc.add_paragraph("[별지 제44호 서식]<개정 23.07.11>").runs[0].font.size = Pt(10)
-    p = doc.add_paragraph("연소기 변경 확인서")
-    p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    p.runs[0].bold = True
-    p.runs[0].font.size = Pt(16)
-
-    p = doc.add_paragraph("(제4-22조 및 제4-31조 관련)")
-    p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    p.runs[0].font.size = Pt(10)
-    doc.add_paragraph()
-
-    # 기본 표
-    tbl = doc.add_table(rows=3, cols=8)
-    tbl.style = "Table Grid"
-    h = tbl.rows[0].cells
-    h[0].text, h[1].text, h[2].text = "번호", "연소기명", "수량"
-    h[3].text, h[4].text = "변경내역", "변경일자"
-    h[5].merge(h[7]).text = "연소기 변경 작업자"
-    sub = tbl.rows[1].cells
-    sub[0].merge(tbl.cell(0, 0)); sub[1].merge(tbl.cell(0, 1)); sub[2].merge(tbl.cell(0, 2))
-    sub[3].merge(tbl.cell(0, 3)); sub[4].merge(tbl.cell(0, 4))
-    sub[5].text, sub[6].text, sub[7].text = "소 속", "성명(서명)", "작업자격"
-
-    d = tbl.rows[2].cells
-    d[0].text, d[1].text, d[2].text = info["번호"], info["연소기명"], str(info["수량"])
-    d[3].text = "✔ 가스보일러 급배기방식 전환"
-    d[4].text = info["변경일"].strftime("%Y-%m-%d")
-    d[5].text, d[6].text, d[7].text = info["작업자_소속"], info["작업자_성명"], info["작업자격"]
-
-    # 확인 문구
-    doc.add_paragraph()
-    doc.add_paragraph("상기와 같이 연소기 변경 작업을 실시하였음을 확인합니다.")
- # 날짜(우측 정렬)
-    p_date = doc.add_paragraph(info["변경일"].strftime("%Y년 %m월 %d일"))
-    p_date.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-
-    # 시공업체 줄 (우측 정렬)
-    p_comp = doc.add_paragraph(f"○ 시공업체(상호): {info['시공업체']}")
-    p_comp.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-
-    # 시공관리자 + 서명
-    if sign_png:
-        p_mgr = doc.add_paragraph()
-        p_mgr.alignment = WD_ALIGN_PARAGRAPH.RIGHT      # ← 단락 정렬
-        run = p_mgr.add_run(f"○ 시공관리자  : {info['시공관리자']}   (서명) ")
-    else:
-        p_mgr = doc.add_paragraph(f"○ 시공관리자  : {info['시공관리자']}   (서명) ")
-        p_mgr.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-
-    # [비고] 표
-    doc.add_paragraph()
-    note_tbl = doc.add_table(rows=1, cols=1)
-    note_tbl.style = "Table Grid"
-    note = (
-        "[비고]\n"
-        "1. 변경내역은 해당되는 사항에 ✔ 표시\n"
-        "2. 기술능력은 연소기 변경 작업자의 자격 기재\n"
-        "   가. 열량법령 작업자격 : 지침 별표18 (예시 : 연소기 제조사 A/S 종사자)\n"
-        "   나. 가스보일러 급배기방식 전환 작업자격 : KGS GC2008 또는 GC209 (예시 : 가스보일러 제조사 A/S 교육 이수자)"
-    )
-    note_tbl.cell(0, 0).text = note
-
-    # docx 반환
-    buf = BytesIO()
-    doc.save(buf)
-    buf.seek(0)
-    return buf
-
-def make_pdf(info: dict) -> BytesIO:
-    from io import BytesIO
-    import os
-    from reportlab.pdfbase import pdfmetrics
-    from reportlab.pdfbase.ttfonts import TTFont
-    from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib import colors
-    from reportlab.lib.units import mm
-    from reportlab.platypus import (
-        SimpleDocTemplate, Paragraph, Table, TableStyle,
-        Spacer, KeepTogether
-    )
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-
-    buffer = BytesIO()
-
-    # 한글 폰트 등록
-    # Streamlit Cloud 환경을 위해 시스템 폰트 사용 시도
-    korean_font = 'Helvetica' # 기본값
-    
-    # 가능한 한글 폰트 파일 이름 목록
-    korean_font_files = ['NanumGothic.ttf', 'NanumGothicBold.ttf', 'UnDotum.ttf', 'gulim.ttc', 'batang.ttc', 'malgun.ttf']
-    
-    # 시스템 폰트 디렉토리 탐색
-    font_dirs = ['/usr/share/fonts/truetype/nanum', # 우분투 나눔 폰트 경로
-                 '/usr/share/fonts/truetype/unfonts-core', # 우분투 unfonts-core 경로
-                 '/usr/share/fonts/truetype', # 일반적인 리눅스 트루타입 폰트 경로
-                 'C:/Windows/Fonts' # 윈도우 폰트 경로
-                ]
-
-    found_font_path = None
-    for font_dir in font_dirs:
-        if os.path.exists(font_dir):
-            for font_file in korean_font_files:
-                font_path = os.path.join(font_dir, font_file)
-                if os.path.exists(font_path):
-                    try:
-                        pdfmetrics.registerFont(TTFont('KoreanFont', font_path))
-                        korean_font = 'KoreanFont'
-                        found_font_path = font_path
-                        break # 폰트를 찾으면 루프 종료
-                    except Exception as e:
-                        print(f"Error registering font {font_path}: {e}")
-            if found_font_path: # 폰트를 찾았으면 외부 루프 종료
-                break
-
-    if korean_font == 'Helvetica':
-        print("Warning: Korean font not found. Using Helvetica instead.")
-
-
-    # 문서 설정
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=20, leftMargin=20,
-        topMargin=20, bottomMargin=20
-    )
+    마지막 칸이 숫자가 아니면 줄 전체를 연소기명으로 보고 수량은 1.
+    숫자처럼 보이지만 1 이상의 정수(0-9)가 아니면 (예: 0, ²) 잘못된 줄로 돌려준다.
+    """
+    units, bad = [], []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        name, sep, qty = line.replace("\t", ",").rpartition(",")
+        qty = qty.strip()
+        if sep and name.strip() and re.fullmatch(r"[0-9]+", qty) and int(qty) >= 1:
+            name, qty = name.strip(), int(qty)
+        elif sep and name.strip() and (qty.isnumeric() or re.fullmatch(r"[-+]?[0-9.]+", qty)):
+            bad.append(line)
+            continue
+        else:
+            name, qty = line, 1
+        units.append({"번호": f"NO.{start + len(units)}", "연소기명": name, "수량": qty})
+    return units, bad
 
-    # 스타일 생성 함수
-    def make_style(name, size, align):
-        return ParagraphStyle(
-            name,
-            fontName=korean_font,
-            fontSize=size,
-            leading=size * 1.6,
-            alignment=align,
-        )
 
-    header_style   = make_style('Header',   9, TA_LEFT)
-    title_style    = make_style('Title',   16, TA_CENTER)
-    subtitle_style = make_style('Subt',    9, TA_CENTER)
-    normal_style   = make_style('Normal',  9, TA_LEFT)
-    right_style    = make_style('Right',   9, TA_RIGHT)
-
-    story = []
-
-    # 제목부
-    story.append(Paragraph("[별지 제44호 서식] <개정 23.07.11>", header_style))
-    story.append(Spacer(1, 4))
-    story.append(Paragraph("<b>연소기 변경 확인서</b>", title_style))
-    story.append(Spacer(1, 4))
-    story.append(Paragraph("(제4-22조 및 제4-31조 관련)", subtitle_style))
-    story.append(Spacer(1, 12))
-
-    # 표 데이터
-    table_data = [
-        ['번호','연소기명','수량','변경내역','변경일자','연소기 변경 작업자','',''],
-        ['','','','','','소속','성명(서명)','작업자격'],
-        [
-            info['번호'],
-            info['연소기명'],
-            str(info['수량']),
-            '✔ 가스보일러\n급배기방식\n전환',
-            info['변경일'].strftime('%Y-%m-%d'),
-            info['작업자_소속'],
-            info['작업자_성명'],
-            # 여기에 선택된 '작업자격'만 넣기
-             info['작업자격'].replace(" ", "\n")  # 원하시면 공백을 줄바꿈으로 바꿀 수도 있습니다
-    ]
-]
 
-
-    # 컬럼 폭 정의 (숫자로만)
-    col_widths = [
-        15* mm,  # 번호
-        35* mm,  # 연소기명
-        8 * mm,  # 수량
-        30 * mm,  # 변경내역 (곱하기 연산자로 수정)
-        25 * mm,  # 변경일자
-        25 * mm,  # 소속
-        25 * mm,  # 성명(서명)
-        25 * mm,  # 작업자격
-    ]
-
-    table = Table(table_data, colWidths=col_widths)
-    table.setStyle(TableStyle([
-        ('GRID',        (0,0), (-1,-1), 0.5, colors.black),
-        ('FONTNAME',    (0,0), (-1,-1), korean_font),
-        ('FONTSIZE',    (0,0), (-1,-1), 9),
-        ('ALIGN',       (0,0), (-1,-1), 'CENTER'),
-        ('VALIGN',      (0,0), (-1,-1), 'MIDDLE'),
-
-        # "변경내역" 셀만 가로·세로 중앙정렬
-        ('ALIGN',       (3,2), (3,2), 'CENTER'),
-        ('VALIGN',      (3,2), (3,2), 'MIDDLE'),
-
-        # 병합은 기존 그대로
-        ('SPAN',        (0,0),(0,1)),
-        ('SPAN',        (1,0),(1,1)),
-        ('SPAN',        (2,0),(2,1)),
-        ('SPAN',        (3,0),(3,1)),
-        ('SPAN',        (4,0),(4,1)),
-        ('SPAN',        (5,0),(7,0)),
-
-        # 패딩 축소
-        ('LEFTPADDING',  (0,0),(-1,-1), 2),
-        ('RIGHTPADDING', (0,0),(-1,-1), 2),
-        ('TOPPADDING',   (0,0),(-1,-1), 2),
-        ('BOTTOMPADDING',(0,0),(-1,-1), 2),
-    ]))
-    
-    # 확인 및 서명부
-    confirm = Paragraph("상기와 같이 연소기 변경 작업을 실시하였음을 확인합니다.", normal_style)
-    date_p  = Paragraph(info['변경일'].strftime('%Y년 %m월 %d일'), right_style)
-    comp_p  = Paragraph(f"○ 시공업체(상호): {info['시공업체']}", right_style)
-    mgr_p   = Paragraph(f"○ 시공관리자  : {info['시공관리자']}   (서명)", right_style)
-
-        # ————————————————————————————————————————
-    # 비고 표: HTML 태그로 줄바꿈·들여쓰기
-    note_text = """
-    <b>[비고]</b><br/>
+# ────────────────────────────────────────────────
+# 3-1) 미리보기 / 문서 캐시
+# ────────────────────────────────────────────────
+PREVIEW_CSS = """
+<style>
+.cert-preview { border:1px solid #999; padding:16px 20px; background:#fff; color:#000; font-size:0.8rem; }
+.cert-preview .cp-title { text-align:center; font-size:1.3rem; font-weight:bold; margin:4px 0; }
+.cert-preview .cp-sub { text-align:center; margin-bottom:10px; }
+.cert-preview table { width:100%; border-collapse:collapse; }
+.cert-preview td, .cert-preview th { border:1px solid #000; padding:2px 4px; text-align:center; vertical-align:middle; font-weight:normal; }
+.cert-preview .cp-right { text-align:right; margin:2px 0; }
+.cert-preview .cp-note { border:1px solid #000; padding:4px 6px; margin-top:12px; }
+</style>
+"""
+
+PREVIEW_MAX_ROWS = 20    # 미리보기는 앞의 몇 대만
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def render_preview_html(info: dict, header_text: str = "") -> str:
+    """make_pdf 와 같은 [별지 제44호] 배치를 가벼운 HTML 로 그린다 (ReportLab 호출 없음)."""
+    e = {k: html.escape(str(v)) for k, v in info.items()}
+    변경일 = info["변경일"]
+    letterhead = (
+        f'<div style="border-bottom:1px solid #000;margin-bottom:6px;">{html.escape(header_text)}</div>'
+        if header_text else ""
+    )
+    units = certificate_units(info)
+    unit_rows = "".join(
+        f"<tr><td>{html.escape(u['번호'])}</td><td>{html.escape(u['연소기명'])}</td><td>{u['수량']}</td>"
+        f"<td>✔ 가스보일러<br/>급배기방식<br/>전환</td><td>{변경일.strftime('%Y-%m-%d')}</td>"
+        f"<td>{e['작업자_소속']}</td><td>{e['작업자_성명']}</td><td>{e['작업자격']}</td></tr>"
+        for u in units[:PREVIEW_MAX_ROWS]
+    )
+    more = f"<p>… 외 {len(units) - PREVIEW_MAX_ROWS}대 (총 {len(units)}대)</p>" if len(units) > PREVIEW_MAX_ROWS else ""
+    return PREVIEW_CSS + f"""
+<div class="cert-preview">
+  {letterhead}
+  <div>[별지 제44호 서식] &lt;개정 23.07.11&gt;</div>
+  <div class="cp-title">연소기 변경 확인서</div>
+  <div class="cp-sub">(제4-22조 및 제4-31조 관련)</div>
+  <table>
+    <tr><th rowspan="2">번호</th><th rowspan="2">연소기명</th><th rowspan="2">수량</th>
+        <th rowspan="2">변경내역</th><th rowspan="2">변경일자</th><th colspan="3">연소기 변경 작업자</th></tr>
+    <tr><th>소속</th><th>성명(서명)</th><th>작업자격</th></tr>
+    {unit_rows}
+  </table>
+  {more}
+  <p style="margin-top:10px;">상기와 같이 연소기 변경 작업을 실시하였음을 확인합니다.</p>
+  <p class="cp-right">{변경일.strftime('%Y년 %m월 %d일')}</p>
+  <p class="cp-right">○ 시공업체(상호): {e['시공업체']}</p>
+  <p class="cp-right">○ 시공관리자 : {e['시공관리자']} &nbsp; (서명)</p>
+  <div class="cp-note"><b>[비고]</b><br/>
     1. 변경내역은 해당되는 사항에 표시<br/>
     2. 기술능력은 연소기 변경 작업자의 자격 기재<br/>
     &nbsp;&nbsp;가. 열량법령 작업자격 : 지침 별표18 (예시 : 연소기 제조사 A/S 종사자)<br/>
     &nbsp;&nbsp;나. 가스보일러 급배기방식 전환 작업자격 : KGS GC2008 또는 GC209<br/>
     &nbsp;&nbsp;&nbsp;&nbsp;(예시 : 가스보일러 제조사 A/S 교육 이수자)
-    """
-    note_para = Paragraph(note_text, normal_style)
-
-    note_table = Table([[note_para]], colWidths=[170*mm])
-    note_table.setStyle(TableStyle([
-        ('GRID',(0,0),(-1,-1),0.5,colors.black),
-        ('FONTNAME',(0,0),(-1,-1),korean_font),
-        ('FONTSIZE',(0,0),(-1,-1),9),
-        ('VALIGN',(0,0),(-1,-1),'TOP'),
-        ('LEFTPADDING',(0,0),(-1,-1),4), ('RIGHTPADDING',(0,0),(-1,-1),4),
-        ('TOPPADDING',(0,0),(-1,-1),4), ('BOTTOMPADDING',(0,0),(-1,-1),4),
-    ]))
-
-    # 한 페이지에 모두 묶기
-    story.append(KeepTogether([
-        table,
-        Spacer(1,8),
-        confirm,
-        Spacer(1,8),
-        date_p,
-        Spacer(1,4),
-        comp_p,
-        Spacer(1,4),
-        mgr_p,
-        Spacer(1,12),
-        note_table
-    ]))
-
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
+  </div>
+</div>
+"""
+
+# 확인서 생성: 같은 입력으로는 make_docx / make_pdf 를 세션에서 한 번만 실행
+# (다운로드 버튼 클릭 시 rerun 포함). 생성은 doc_scheduler 를 거쳐 동시 실행 수를 제한하고,
+# 세션에는 파일 내용 대신 payload_store 의 digest 만 보관합니다.
+def render_documents(info: dict, profile: dict) -> dict:
+    docs = ss.rendered_docs
+    key = (profile["id"], profile["fingerprint"])
+    if docs and docs["info"] == info and docs["dealer"] == key and all(docs[k] in payload_store for k in ("docx", "pdf") if k in docs):
+        return docs
+
+    waiting = st.empty()
+
+    def on_wait(position):
+        waiting.info(f"⏳ 문서 생성 대기 중입니다. (대기 순번 {position})")
+
+    def build():
+        template = get_template(profile)
+        # 진위 확인용 검증코드 발급 (QR 로 인쇄)
+        signed = dict(info, 검증코드=issue_verify_code(info))
+        docs = {"info": info, "dealer": key, "code": signed["검증코드"],
+                "docx": payload_store.put_bytes(make_docx(signed, None, template).getvalue())}
+        try:
+            docs["pdf"] = payload_store.put_bytes(make_pdf(signed, template).getvalue())
+        except Exception as e:
+            docs["pdf_error"] = str(e)
+        return docs
 
+    try:
+        # 여러 대 확인서는 한 장짜리 요청보다 뒤로
+        priority = PRIORITY_BULK if len(certificate_units(info)) > 20 else PRIORITY_INTERACTIVE
+        docs = doc_scheduler.run(build, priority=priority, on_wait=on_wait)
+    finally:
+        waiting.empty()
+    ss.rendered_docs = docs
+    return docs
 
 # ────────────────────────────────────────────────
-# 4) 데이터 (질문에서 주신 전체 리스트 그대로)
+# 4) 데이터 (제조사·구분별 샤드는 catalog_store.py, 선택한 구분만 읽음)
 # ────────────────────────────────────────────────
 
-data = [
-    # ── 일반형 개방식 ──
-    {"구분": "일반형", "세부구분": "개방식", "모델명": "NGB513", "연료": "LNG", "급배기방식": "FF",
-     "용량": "13K, 16K, 20K, 25K, 30K, 35K", "비고": "대리점신축", "전환여부": "전환불가"},
-    {"구분": "일반형", "세부구분": "개방식", "모델명": "NGB513", "연료": "LPG", "급배기방식": "FF",
-     "용량": "13K, 16K, 20K, 25K, 30K, 35K", "비고": "대리점신축", "전환여부": "전환불가"},
-
-    {"구분": "일반형", "세부구분": "개방식", "모델명": "NGB553", "연료": "LNG", "급배기방식": "FF",
-     "용량": "13K, 16K, 20K, 25K, 30K, 35K", "비고": "대리점유통", "전환여부": "전환가능"},
-    {"구분": "일반형", "세부구분": "개방식", "모델명": "NGB553", "연료": "LNG", "급배기방식": "FE",
-     "용량": "13K, 16K, 20K, 25K, 30K, 35K", "비고": "대리점유통", "전환여부": "전환가능"},
-    {"구분": "일반형", "세부구분": "개방식", "모델명": "NGB553", "연료": "LPG", "급배기방식": "FF",
-     "용량": "13K, 16K", "비고": "대리점유통", "전환여부": "전환불가"},
-    {"구분": "일반형", "세부구분": "개방식", "모델명": "NGB553", "연료": "LPG", "급배기방식": "FF",
-     "용량": "20K, 25K, 30K, 35K", "비고": "대리점유통", "전환여부": "전환가능"},
-    {"구분": "일반형", "세부구분": "개방식", "모델명": "NGB553", "연료": "LPG", "급배기방식": "FE",
-     "용량": "20K, 25K, 30K, 35K", "비고": "대리점유통", "전환여부": "전환가능"},
-
-
-    # ── 콘덴싱 개방식 ──
-    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB311", "연료": "LNG", "급배기방식": "FF",
-     "용량": "15K, 18K, 22K, 27K, 33K, 36K", "비고": "특판(단종예정)", "전환여부": "전환불가"},
-    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB311", "연료": "LPG", "급배기방식": "FF",
-     "용량": "15K, 18K, 22K, 27K, 33K, 36K", "비고": "특판(단종예정)", "전환여부": "전환불가"},
- 
-    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB314", "연료": "LNG", "급배기방식": "FF",
-     "용량": "15K, 18K, 22K, 27K, 33K", "비고": "특판", "전환여부": "전환불가"},
-    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB314", "연료": "LPG", "급배기방식": "FF",
-     "용량": "15K, 18K, 22K, 27K, 33K", "비고": "특판", "전환여부": "전환불가"},
-
-    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB324", "연료": "LNG", "급배기방식": "FF",
-     "용량": "15K, 18K, 22K, 27K, 33K", "비고": "대리점신축", "전환여부": "전환불가"},
-    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB324", "연료": "LPG", "급배기방식": "FF",
-     "용량": "15K, 18K, 22K, 27K, 33K", "비고": "대리점신축", "전환여부": "전환불가"},
-
+def set_verdict(r, sel_c, sel_f, sel_v) -> str:
+    """판별 결과를 세션에 저장하고 안내 문장을 돌려준다."""
+    is_ok = "전환가능" in r["전환여부"]
+    ss.conversion_ok = is_ok
+    ss['판별완료'] = True
+
+    status_text = "전환가능" if is_ok else "전환불가"
+    word_html = (
+        f'<span style="color:blue;font-weight:bold;">{status_text}</span>'
+        if is_ok else
+        f'<span style="color:red;font-weight:bold;">{status_text}</span>'
+    )
+    ss.status_html = word_html
+    ss.show_status = True
+    ss.model_full = f"{r['모델명']}-{sel_c} ({sel_f}, {sel_v})"
+    get_stats().record_verdict(r["모델명"], sel_f, sel_v, is_ok, brand=ss.selected_제조사)
+
+    return (
+        f"{r['비고']}에 설치되는 {r['구분']} 가스보일러 "
+        f"{ss.model_full} ({r['세부구분']}) 는 급배기방식 {word_html} 합니다."
+    )
 
-    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB354", "연료": "LNG", "급배기방식": "FF",
-     "용량": "15K, 18K, 22K, 27K, 33K", "비고": "대리점 유통", "전환여부": "전환가능"},
-    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB354", "연료": "LNG", "급배기방식": "FE",
-     "용량": "15K, 18K, 22K, 27K, 33K", "비고": "대리점 유통", "전환여부": "전환가능"},
-    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB354", "연료": "LPG", "급배기방식": "FF",
-     "용량": "15K, 18K, 22K, 27K, 33K", "비고": "대리점 유통", "전환여부": "전환가능"},
-    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB354", "연료": "LPG", "급배기방식": "FE",
-     "용량": "15K, 18K, 22K, 27K, 33K", "비고": "대리점 유통", "전환여부": "전환가능"},
+HISTORY_LIMIT = 50       # 세션당 다운로드 기록 보관 건수
 
+# 확인서 작업자격 선택지
+FORM_QUALIFICATIONS = [
+    "가스보일러 제조사의 A/S 종사자",
+    "가스보일러 판매업체 직원으로서 제조사 A/S 교육 이수자",
+    "가스보일러 판매업체 직원으로서 A/S 업무 2년 이상",
+]
 
-    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB384", "연료": "LNG", "급배기방식": "FF",
-     "용량": "18K, 22K, 27K, 33K", "비고": "수요개발", "전환여부": "전환불가"},
-
-
-
-    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB553", "연료": "LNG", "급배기방식": "FF",
-     "용량": "22K, 27K, 33K, 43K", "비고": "대리점유통", "전환여부": "전환불가"},
-    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB553", "연료": "LPG", "급배기방식": "FF",
-     "용량": "22K, 27K, 33K, 43K", "비고": "대리점유통", "전환여부": "전환불가"},
-
-
-
-    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB713", "연료": "LNG", "급배기방식": "FF",
-     "용량": "22K, 27K, 33K, 43K", "비고": "특판", "전환여부": "전환불가"},
-    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB713", "연료": "LPG", "급배기방식": "FF",
-     "용량": "22K, 27K, 33K, 43K", "비고": "특판", "전환여부": "전환불가"},
-
-
-    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB753", "연료": "LNG", "급배기방식": "FF",
-     "용량": "22K, 27K, 33K, 43K", "비고": "대리점유통", "전환여부": "전환불가"},
-    {"구분": "콘덴싱", "세부구분": "개방식", "모델명": "NCB753", "연료": "LPG", "급배기방식": "FF",
-     "용량": "22K, 27K, 33K, 43K", "비고": "대리점유통", "전환여부": "전환불가"},
-
-
-
-    # ── 일반형 밀폐식 ──
-
-    {"구분": "일반형", "세부구분": "밀폐식", "모델명": "NGB553", "연료": "LNG", "급배기방식": "FF",
-     "용량": "13L, 16L", "비고": "대리점유통", "전환여부": "전환불가"},
-    {"구분": "일반형", "세부구분": "밀폐식", "모델명": "NGB553", "연료": "LNG", "급배기방식": "FF",
-     "용량": "20L, 25L, 30L, 35L", "비고": "대리점유통", "전환여부": "전환가능"},
-    {"구분": "일반형", "세부구분": "밀폐식", "모델명": "NGB553", "연료": "LNG", "급배기방식": "FE",
-     "용량": "20L, 25L, 30L, 35L", "비고": "대리점유통", "전환여부": "전환가능"},
-    {"구분": "일반형", "세부구분": "밀폐식", "모델명": "NGB553", "연료": "LPG", "급배기방식": "FF",
-     "용량": "13L, 16L, 20L, 25L, 30L, 35L", "비고": "대리점유통", "전환여부": "전환불가"},
-
-
-    # ── 콘덴싱 밀폐식 ──
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB311", "연료": "LNG", "급배기방식": "FF",
-     "용량": "18L, 22L, 27L, 33L, 36L, 43L", "비고": "특판(단종예정)", "전환여부": "전환불가"},
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB311", "연료": "LPG", "급배기방식": "FF",
-     "용량": "18L, 22L, 27L, 33L", "비고": "특판(단종예정)", "전환여부": "전환불가"},
-
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB314", "연료": "LNG", "급배기방식": "FF",
-     "용량": "18L, 22L, 27L, 33L", "비고": "특판", "전환여부": "전환불가"},
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB314", "연료": "LPG", "급배기방식": "FF",
-     "용량": "18L, 22L, 27L, 33L", "비고": "특판", "전환여부": "전환불가"},
-
-
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB354", "연료": "LNG", "급배기방식": "FF",
-     "용량": "15L, 18L, 22L, 27L, 33L", "비고": "대리점 유통", "전환여부": "전환가능"},
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB354", "연료": "LNG", "급배기방식": "FE",
-     "용량": "15L, 18L, 22L, 27L, 33L", "비고": "대리점 유통", "전환여부": "전환가능"},
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB354", "연료": "LPG", "급배기방식": "FF",
-     "용량": "15L, 18L, 22L, 27L, 33L", "비고": "대리점 유통", "전환여부": "전환불가"},
-
-
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB553", "연료": "LNG", "급배기방식": "FF",
-     "용량": "22L, 27L, 33L", "비고": "대리점유통", "전환여부": "전환불가"},
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB553", "연료": "LNG", "급배기방식": "FF",
-     "용량": "43L", "비고": "대리점유통", "전환여부": "전환가능"},
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB553", "연료": "LNG", "급배기방식": "FE",
-     "용량": "43L", "비고": "대리점유통", "전환여부": "전환가능"},
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB553", "연료": "LPG", "급배기방식": "FF",
-     "용량": "22L, 27L, 33L, 43L", "비고": "대리점유통", "전환여부": "전환불가"},
-
-
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB713", "연료": "LNG", "급배기방식": "FF",
-     "용량": "22L, 27L, 33L, 43L", "비고": "특판", "전환여부": "전환불가"},
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB713", "연료": "LPG", "급배기방식": "FF",
-     "용량": "22L, 27L, 33L, 43L", "비고": "특판", "전환여부": "전환불가"},
-
-
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB753", "연료": "LNG", "급배기방식": "FF",
-     "용량": "22L, 27L, 33L", "비고": "대리점유통", "전환여부": "전환불가"},
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB753", "연료": "LNG", "급배기방식": "FF",
-     "용량": "43L", "비고": "대리점유통", "전환여부": "전환가능"},
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB753", "연료": "LNG", "급배기방식": "FE",
-     "용량": "43L", "비고": "대리점유통", "전환여부": "전환가능"},
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB753", "연료": "LPG", "급배기방식": "FF",
-     "용량": "22L, 27L, 33L, 43L", "비고": "대리점유통", "전환여부": "전환불가"},
-
-
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB900", "연료": "LNG", "급배기방식": "FF",
-     "용량": "43L, 52L", "비고": "대리점유통", "전환여부": "전환불가"},
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB900", "연료": "LPG", "급배기방식": "FF",
-     "용량": "43L, 52L", "비고": "대리점유통", "전환여부": "전환불가"},
-
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NPW(single)", "연료": "LNG", "급배기방식": "FF",
-     "용량": "36KSS, 36KDS, 48KSS, 48KDS", "비고": "단품용", "전환여부": "전환가능"},
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NPW(single)", "연료": "LNG", "급배기방식": "FE",
-     "용량": "36KSS, 36KDS, 48KSS, 48KDS", "비고": "단품용", "전환여부": "전환가능"},
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NPW(single)", "연료": "LPG", "급배기방식": "FF",
-     "용량": "36KSS, 36KDS, 48KSS, 48KDS", "비고": "단품용", "전환여부": "전환가능"},
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NPW(single)", "연료": "LPG", "급배기방식": "FE",
-     "용량": "36KSS, 36KDS, 48KSS, 48KDS", "비고": "단품용", "전환여부": "전환가능"},
-
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB790(single)", "연료": "LNG", "급배기방식": "FF",
-     "용량": "45LSS", "비고": "단품용", "전환여부": "전환가능"},
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB790(single)", "연료": "LNG", "급배기방식": "FE",
-     "용량": "45LSS", "비고": "단품용", "전환여부": "전환가능"},
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB790(single)", "연료": "LPG", "급배기방식": "FF",
-     "용량": "45LSS", "비고": "단품용", "전환여부": "전환가능"},
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB790(single)", "연료": "LPG", "급배기방식": "FE",
-     "용량": "45LSS", "비고": "단품용", "전환여부": "전환가능"},
-
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NFB790(single)", "연료": "LNG", "급배기방식": "FF",
-     "용량": "75LSS, 100LSS", "비고": "단품용", "전환여부": "전환가능"},
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB790(single)", "연료": "LNG", "급배기방식": "FE",
-     "용량": "75LSS, 100LSS", "비고": "단품용", "전환여부": "전환가능"},
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB790(single)", "연료": "LPG", "급배기방식": "FF",
-     "용량": "75LSS, 100LSS", "비고": "단품용", "전환여부": "전환가능"},
-    {"구분": "콘덴싱", "세부구분": "밀폐식", "모델명": "NCB790(single)", "연료": "LPG", "급배기방식": "FE",
-     "용량": "75LSS, 100LSS", "비고": "단품용", "전환여부": "전환가능"},
-
-    # ── 캐스케이드용 밀폐식 ──
-    {"구분": "캐스케이드용", "세부구분": "밀폐식", "모델명": "NPW", "연료": "LNG", "급배기방식": "FF",
-     "용량": "36KS, 36KD, 48KS, 48KD", "비고": "캐스케이드용", "전환여부": "전환가능"},
-    {"구분": "캐스케이드용", "세부구분": "밀폐식", "모델명": "NPW", "연료": "LNG", "급배기방식": "FE",
-     "용량": "36KS, 36KD, 48KS, 48KD", "비고": "캐스케이드용", "전환여부": "전환가능"},
-    {"구분": "캐스케이드용", "세부구분": "밀폐식", "모델명": "NPW", "연료": "LPG", "급배기방식": "FF",
-     "용량": "36KS, 36KD, 48KS, 48KD", "비고": "캐스케이드용", "전환여부": "전환가능"},
-    {"구분": "캐스케이드용", "세부구분": "밀폐식", "모델명": "NPW", "연료": "LPG", "급배기방식": "FE",
-     "용량": "36KS, 36KD, 48KS, 48KD", "비고": "캐스케이드용", "전환여부": "전환가능"},
-
-    {"구분": "캐스케이드용", "세부구분": "밀폐식", "모델명": "NCB790", "연료": "LNG", "급배기방식": "FF",
-     "용량": "45LS", "비고": "캐스케이드용", "전환여부": "전환가능"},
-    {"구분": "캐스케이드용", "세부구분": "밀폐식", "모델명": "NCB790", "연료": "LNG", "급배기방식": "FE",
-     "용량": "45LS", "비고": "캐스케이드용", "전환여부": "전환가능"},
-    {"구분": "캐스케이드용", "세부구분": "밀폐식", "모델명": "NCB790", "연료": "LPG", "급배기방식": "FF",
-     "용량": "45LS", "비고": "캐스케이드용", "전환여부": "전환가능"},
-    {"구분": "캐스케이드용", "세부구분": "밀폐식", "모델명": "NCB790", "연료": "LPG", "급배기방식": "FE",
-     "용량": "45LS", "비고": "캐스케이드용", "전환여부": "전환가능"},
-
-    {"구분": "캐스케이드용", "세부구분": "밀폐식", "모델명": "NFB790", "연료": "LNG", "급배기방식": "FF",
-     "용량": "100LS", "비고": "캐스케이드용", "전환여부": "전환가능"},
-    {"구분": "캐스케이드용", "세부구분": "밀폐식", "모델명": "NFB790", "연료": "LNG", "급배기방식": "FE",
-     "용량": "100LS", "비고": "캐스케이드용", "전환여부": "전환가능"},
-    {"구분": "캐스케이드용", "세부구분": "밀폐식", "모델명": "NFB790", "연료": "LPG", "급배기방식": "FF",
-     "용량": "100LS", "비고": "캐스케이드용", "전환여부": "전환가능"},
-    {"구분": "캐스케이드용", "세부구분": "밀폐식", "모델명": "NFB790", "연료": "LPG", "급배기방식": "FE",
-     "용량": "100LS", "비고": "캐스케이드용", "전환여부": "전환가능"},
+# 모델 확인 화면의 작업자 자격 선택지 (앞의 세 항목은 FORM_QUALIFICATIONS 와 같은 순서)
+MODEL_QUALIFICATIONS = [
+    "가스보일러 제조사의 A/S 종사자",
+    "가스보일러 판매업체 직원으로서 가스보일러 제조사의 A/S 교육을 받은 자",
+    "가스보일러 판매업체 직원으로서 A/S 업무에 2년 이상 근무한 자",
+    "해당없음",
 ]
 
-df = pd.DataFrame(data)
+def apply_roster_record(w):
+    """명단의 (성명, 소속, 작업자격, 교육일자) 로 작업자 입력란과 모델 확인 화면의 자격을 채우고 다시 그린다."""
+    q = w[2]
+    if q not in FORM_QUALIFICATIONS:
+        if "교육" in q:
+            q = FORM_QUALIFICATIONS[1]
+        elif "2년" in q:
+            q = FORM_QUALIFICATIONS[2]
+        elif "제조사" in q:
+            q = FORM_QUALIFICATIONS[0]
+        else:
+            q = None             # 명단 자격을 알 수 없으면 선택한 값 유지
+    if q is not None:
+        ss.form_작업자격 = q
+        ss.selected_qualification = MODEL_QUALIFICATIONS[FORM_QUALIFICATIONS.index(q)]
+        ss.pop("qualification_radio", None)     # 모델 확인 화면으로 돌아가면 명단 자격으로 표시
+    ss.form_작업자_성명, ss.form_작업자_소속 = w[0], w[1]
+    ss.roster_autofilled = w
+    st.rerun()
+
+# QR 라벨 딥링크 (?brand=…&cat=…&sub=…&model=…&cap=…&fuel=…&vent=…) → 제품 선택 + 판별 완료 상태로 시작
+if not ss.deep_link_applied and "model" in st.query_params:
+    ss.deep_link_applied = True
+    brand = st.query_params.get("brand", DEFAULT_BRAND)
+    shard = catalog_store.shard(brand, st.query_params.get("cat", ""))
+    sku = shard and shard.find_sku({k: st.query_params.get(p, "") for k, p in DEEP_LINK_PARAMS.items()})
+    if sku is None:
+        st.warning("QR 코드의 제품 정보를 찾을 수 없습니다. 제품을 직접 선택해주세요.")
+    else:
+        ss.selected_제조사 = brand
+        for k in DEEP_LINK_PARAMS:
+            ss[f"selected_{k}"] = sku[k]
+        set_verdict(sku, sku["용량"], sku["연료"], sku["급배기방식"])
+        ss.page = "product"
+
+# 모델 역검색 (콜센터용) 이동 버튼
+if ss.page == "search":
+    if st.sidebar.button("◀ 모델 확인 화면으로"):
+        ss.page = "model"
+        st.rerun()
+elif st.sidebar.button("🔎 모델 역검색"):
+    ss.page = "search"
+    ss.show_status = False
+    st.rerun()
 
 # ────────────────────────────────────────────────
 # 5) 페이지 로직
 # ────────────────────────────────────────────────
+if ss.page == "search":
+    st.title("급배기전환 모델 역검색")
+    st.caption("원하는 조건을 순서와 관계없이 선택하세요. 괄호 안은 현재 조건에서 해당 값을 고를 때의 제품 수입니다.")
+    brands = catalog_store.brands()
+    brand = st.selectbox("제조사", brands, key="facet_brand") if len(brands) > 1 else brands[0]
+    index = catalog_index(brand)
+
+    # 현재 선택 → 항목값별 건수 (비트맵 AND + popcount)
+    selected = {f: ss.get(f"facet_{brand}_{f}", []) for f in FACETS}
+    counts = index.counts(selected)
+
+    cols = st.columns(4)
+    for i, f in enumerate(FACETS):
+        cols[i % 4].multiselect(
+            f, index.values(f), key=f"facet_{brand}_{f}",
+            format_func=lambda v, f=f: f"{v} ({counts[f][v]})",
+        )
+
+    mask = index.match(selected)
+    total = mask.bit_count()
+    st.markdown(f"### ■ 검색 결과 : {total:,}건")
+    if total:
+        shown = index.rows(mask, limit=500)
+        st.dataframe(
+            pd.DataFrame(shown)[["구분", "세부구분", "모델명", "용량", "연료", "급배기방식", "비고", "전환여부"]],
+            hide_index=True,
+        )
+        if total > len(shown):
+            st.caption(f"앞의 {len(shown)}건만 표시합니다. 조건을 더 선택해주세요.")
+    st.stop()
+
 if st.session_state.page == "model":
     st.title("경동나비엔 가스보일러 급배기전환 모델 확인 프로그램")
 
@@ -592,19 +459,9 @@ if st.session_state.page == "model":
 
     q = st.radio(
         "급배기전환 작업이 가능한 작업자인지 확인해주세요.",
-        [
-            "가스보일러 제조사의 A/S 종사자",
-            "가스보일러 판매업체 직원으로서 가스보일러 제조사의 A/S 교육을 받은 자",
-            "가스보일러 판매업체 직원으로서 A/S 업무에 2년 이상 근무한 자",
-            "해당없음",
-        ],
+        MODEL_QUALIFICATIONS,
         key="qualification_radio",
-        index=[
-            "가스보일러 제조사의 A/S 종사자",
-            "가스보일러 판매업체 직원으로서 가스보일러 제조사의 A/S 교육을 받은 자",
-            "가스보일러 판매업체 직원으로서 A/S 업무에 2년 이상 근무한 자",
-            "해당없음"
-        ].index(st.session_state.qualification_radio)
+        index=MODEL_QUALIFICATIONS.index(st.session_state.qualification_radio)
     )
     ss.selected_qualification = st.session_state.qualification_radio
 
@@ -656,31 +513,37 @@ div[data-testid="stSelectbox"] > div {
 """, unsafe_allow_html=True)
 
 
-    sel_g = st.selectbox("1. 구분", df["구분"].unique(), 
-                        index=0 if not ss.selected_구분 else list(df["구분"].unique()).index(ss.selected_구분))
+    # 제조사가 여럿일 때만 표시 (구분 목록은 index.json 에서, 제품은 고른 구분의 샤드만 읽음)
+    brands = catalog_store.brands()
+    brand_index = brands.index(ss.selected_제조사) if ss.selected_제조사 in brands else 0
+    sel_b = st.selectbox("제조사", brands, index=brand_index) if len(brands) > 1 else brands[0]
+    ss.selected_제조사 = sel_b
+
+    category_list = catalog_store.categories(sel_b)
+    category_index = 0 if ss.selected_구분 not in category_list else category_list.index(ss.selected_구분)
+    sel_g = st.selectbox("1. 구분", category_list,
+                        index=category_index)
     ss.selected_구분 = sel_g
-    df2 = df[df["구분"] == sel_g]
+    # 목록은 샤드의 코드 배열로 거르고, 판별할 때 맞는 행 하나만 풀어 냄 (매 rerun 마다 표를 만들지 않음)
+    shard = catalog_store.shard(sel_b, sel_g)
 
     # 세부구분 선택 로직 수정
-    sub_category_list = list(df2["세부구분"].unique())
+    sub_category_list = shard.distinct("세부구분")
     sub_category_index = 0 if not ss.selected_세부구분 or ss.selected_세부구분 not in sub_category_list else sub_category_list.index(ss.selected_세부구분)
     sel_s = st.selectbox("2. 세부구분", sub_category_list,
                         index=sub_category_index)
     ss.selected_세부구분 = sel_s
-    df3 = df2[df2["세부구분"] == sel_s]
+    where = {"세부구분": sel_s}
 
     # 모델명 선택 로직 (이미 수정됨)
-    model_list = list(df3["모델명"].unique())
+    model_list = shard.distinct("모델명", where)
     model_index = 0 if not ss.selected_모델명 or ss.selected_모델명 not in model_list else model_list.index(ss.selected_모델명)
     sel_m = st.selectbox("3. 모델명", model_list,
                         index=model_index)
     ss.selected_모델명 = sel_m
 
-    df4 = df3[df3["모델명"] == sel_m]
-    caps = []
-    for cs in df4["용량"].unique():
-        caps.extend(["없음"] if cs.strip() == "없음" else [c.strip() for c in cs.split(",")])
-    caps = sorted(set(caps))
+    where["모델명"] = sel_m
+    caps = sorted({c for cs in shard.distinct("용량", where) for c in split_capacity(cs)})
 
     # 용량 선택 로직 수정
     capacity_list = caps
@@ -689,18 +552,18 @@ div[data-testid="stSelectbox"] > div {
                         index=capacity_index)
     ss.selected_용량 = sel_c
 
-    df5 = df4[df4.apply(lambda r: capacity_ok(r, sel_c), axis=1)]
+    where["용량"] = [cs for cs in shard.distinct("용량", where) if sel_c in split_capacity(cs)]
 
     # 사용연료 선택 로직 수정
-    fuel_list = list(df5["연료"].unique())
+    fuel_list = shard.distinct("연료", where)
     fuel_index = 0 if not ss.selected_연료 or ss.selected_연료 not in fuel_list else fuel_list.index(ss.selected_연료)
     sel_f = st.selectbox("5. 사용연료", fuel_list,
                         index=fuel_index)
     ss.selected_연료 = sel_f
-    df6 = df5[df5["연료"] == sel_f]
+    where["연료"] = sel_f
 
     # 급배기방식 선택 로직 수정
-    exhaust_list = list(df6["급배기방식"].unique())
+    exhaust_list = shard.distinct("급배기방식", where)
     exhaust_index = 0 if not ss.selected_급배기방식 or ss.selected_급배기방식 not in exhaust_list else exhaust_list.index(ss.selected_급배기방식)
     sel_v = st.selectbox("6. 급배기방식", exhaust_list,
                         index=exhaust_index)
@@ -714,32 +577,15 @@ div[data-testid="stSelectbox"] > div {
         ss['판별완료'] = False
 
     if btn_col.button("판별하기"):
-        fdf = df6[df6["급배기방식"] == sel_v]
-        if fdf.empty:
+        found = shard.select(dict(where, 급배기방식=sel_v))
+        if not found:
             ss.show_status = False
             ss.conversion_ok = False
             ss['판별완료'] = False
             st.warning("선택한 조건에 맞는 모델이 없습니다. (또는 전환불가)")
         else:
-            r = fdf.iloc[0]
-            is_ok = "전환가능" in r["전환여부"]
-            ss.conversion_ok = is_ok
-            ss['판별완료'] = True
-
-            status_text = "전환가능" if is_ok else "전환불가"
-            word_html = (
-                f'<span style="color:blue;font-weight:bold;">{status_text}</span>'
-                if is_ok else
-                f'<span style="color:red;font-weight:bold;">{status_text}</span>'
-            )
-            ss.status_html = word_html
-            ss.show_status = True
-            ss.model_full = f"{r['모델명']}-{sel_c} ({sel_f}, {sel_v})"
-
-            sentence = (
-                f"{r['비고']}에 설치되는 {r['구분']} 가스보일러 "
-                f"{ss.model_full} ({r['세부구분']}) 는 급배기방식 {word_html} 합니다."
-            )
+            r = shard.row(found[0])
+            sentence = set_verdict(r, sel_c, sel_f, sel_v)
             msg_col.markdown(sentence, unsafe_allow_html=True)
 
 if ss.show_status:
@@ -787,6 +633,18 @@ elif ss.page == "form":
     # 라벨 표시를 별도 줄에 배치
     g1.caption("번호"); g2.caption("연소기명"); g3.caption("수량"); g4.caption("변경일자")
 
+    # 여러 대를 한 확인서에 (엑셀에서 연소기명·수량 두 열을 복사해 붙여넣어도 됩니다)
+    추가연소기 = st.text_area(
+        "추가 연소기 (NO.2 부터, 한 줄에 하나 : 연소기명, 수량)", value=ss.form_추가연소기,
+        placeholder="NCB354-18K (LNG, FF), 2",
+    )
+    ss.form_추가연소기 = 추가연소기
+    추가_units, 잘못된_줄 = parse_units(추가연소기)
+    if 잘못된_줄:
+        st.warning("수량은 1 이상의 숫자로 입력해주세요: " + " / ".join(잘못된_줄))
+    if 추가_units:
+        st.caption(f"총 {len(추가_units) + 1}대")
+
     st.checkbox("가스보일러 급배기방식 전환 ", value=True, disabled=True)
 
     # == 작업자 정보 ==
@@ -794,11 +652,7 @@ elif ss.page == "form":
     j1, j2, j3 = st.columns([1, 1, 2])
     작업자_소속 = j1.text_input("소속", value=ss.form_작업자_소속)
     작업자_성명 = j2.text_input("성명(서명)", value=ss.form_작업자_성명)
-    radio = [
-        "가스보일러 제조사의 A/S 종사자",
-        "가스보일러 판매업체 직원으로서 제조사 A/S 교육 이수자",
-        "가스보일러 판매업체 직원으로서 A/S 업무 2년 이상",
-    ]
+    radio = FORM_QUALIFICATIONS
     작업자격 = j3.radio("작업자격", radio, 
                     index=0 if not ss.form_작업자격 else radio.index(ss.form_작업자격))
 
@@ -807,6 +661,27 @@ elif ss.page == "form":
     ss.form_작업자_성명 = 작업자_성명
     ss.form_작업자격 = 작업자격
 
+    # 등록된 작업자 명단 : 성명으로 소속·작업자격 자동 입력 / 자격 확인
+    if 작업자_성명:
+        registered = worker_roster.lookup(작업자_성명)
+        if len(registered) == 1:
+            w = registered[0]
+            if ss.roster_autofilled != w:
+                apply_roster_record(w)
+            j2.caption(f"✔ 등록된 작업자 ({w[1]}, 교육일자 {w[3] or '-'})")
+        else:
+            candidates = registered or worker_roster.complete(작업자_성명)
+            if candidates:
+                pick = j2.selectbox(
+                    "등록된 작업자 선택", range(len(candidates)), index=None,
+                    format_func=lambda i: f"{candidates[i][0]} ({candidates[i][1]}, {candidates[i][2]})",
+                    placeholder="명단에서 선택하면 소속·작업자격이 입력됩니다",
+                )
+                if pick is not None and ss.roster_autofilled != candidates[pick]:
+                    apply_roster_record(candidates[pick])
+            elif len(worker_roster.snapshot):
+                j2.caption("명단에 없는 작업자입니다. (자격 확인 불가)")
+
     s1, s2 = st.columns(2)
     시공업체 = s1.text_input("시공업체(상호)", value=ss.form_시공업체)
     시공관리자 = s2.text_input("시공관리자", value=ss.form_시공관리자)
@@ -841,56 +716,67 @@ elif ss.page == "form":
     }
     </style>
     """, unsafe_allow_html=True)
+    # 문서 정보 (미리보기와 다운로드가 같은 데이터를 사용)
+    doc_info = dict(
+        번호="NO.1", 
+        연소기명=연소기명, 
+        수량=수량, 
+        변경일=변경일자,
+        작업자_소속=작업자_소속, 
+        작업자_성명=작업자_성명, 
+        작업자격=작업자격,
+        시공업체=시공업체, 
+        시공관리자=시공관리자
+    )
+    if 추가_units:
+        doc_info["units"] = [{"번호": "NO.1", "연소기명": 연소기명, "수량": 수량}] + 추가_units
+
+    # ── 미리보기 ──
+    # 텍스트 입력은 Enter / 포커스 이동 시에만 반영되므로 키 입력마다 다시 그리지 않고,
+    # 같은 입력의 미리보기는 캐시된 HTML 을 재사용합니다.
+    with st.expander("■ 확인서 미리보기", expanded=True):
+        st.markdown(render_preview_html(doc_info, dealer["header_text"]), unsafe_allow_html=True)
+
     # ── 다운로드 버튼 ──
     if st.button("연소기 변경 확인서 다운로드"):
+        # 필수 입력값 검증
+        if not all([작업자_소속, 작업자_성명, 시공업체, 시공관리자]):
+            st.error("모든 필수 항목을 입력해주세요.")
+            st.stop()
+        if 잘못된_줄:
+            st.error("추가 연소기의 수량을 확인해주세요.")
+            st.stop()
+
+        # 현재 입력 정보를 딕셔너리로 저장
+        current_data = dict(doc_info, timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+        # 히스토리에 추가 (최근 HISTORY_LIMIT 건만 보관)
+        st.session_state.history.append(current_data)
+        del st.session_state.history[:-HISTORY_LIMIT]
+        ss.download_info = doc_info
+
+    # 입력이 바뀌지 않은 동안에는 저장 버튼 유지 (저장 버튼 클릭으로 rerun 되어도 다시 생성하지 않음)
+    if ss.download_info == doc_info:
         try:
-            # 필수 입력값 검증
-            if not all([작업자_소속, 작업자_성명, 시공업체, 시공관리자]):
-                st.error("모든 필수 항목을 입력해주세요.")
-                st.stop()
-
-            # 현재 입력 정보를 딕셔너리로 저장
-            current_data = {
-                "번호": "NO.1",
-                "연소기명": 연소기명,
-                "수량": 수량,
-                "변경일": 변경일자,
-                "작업자_소속": 작업자_소속,
-                "작업자_성명": 작업자_성명,
-                "작업자격": 작업자격,
-                "시공업체": 시공업체,
-                "시공관리자": 시공관리자,
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-            
-            # 히스토리에 추가
-            st.session_state.history.append(current_data)
+            docs = render_documents(doc_info, dealer)
+
+            # 발급 통계: 새로 만들어진 확인서(검증코드)마다 한 번
+            if ss.certificate_recorded != docs["code"]:
+                get_stats().record_certificate(ss.selected_모델명, ss.selected_연료, ss.selected_급배기방식,
+                                               시공업체, brand=ss.selected_제조사)
+                ss.certificate_recorded = docs["code"]
 
             # 파일명 기본 부분
             base_name = f"연소기_변경_확인서_{sanitize(시공관리자)}"
-            
-            # 문서 정보
-            doc_info = dict(
-                번호="NO.1", 
-                연소기명=연소기명, 
-                수량=수량, 
-                변경일=변경일자,
-                작업자_소속=작업자_소속, 
-                작업자_성명=작업자_성명, 
-                작업자격=작업자격,
-                시공업체=시공업체, 
-                시공관리자=시공관리자
-            )
-
-            # 두 개의 버튼을 나란히 배치
+
+            # 두 개의 버튼을 나란히 배치 (파일 내용은 사용자가 저장을 누를 때만 디스크에서 읽음)
             col1, col2 = st.columns(2)
 
             with col1:
                 # 워드 파일 다운로드
-                word_buf = make_docx(doc_info, None)
                 st.download_button(
                     "📄 Word 파일 저장",
-                    data=word_buf.getvalue(),
+                    data=lambda d=docs["docx"]: payload_store.get_bytes(d),
                     file_name=f"{base_name}.docx",
                     mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
                     key="download_word"
@@ -898,20 +784,23 @@ elif ss.page == "form":
 
             with col2:
                 # PDF 파일 다운로드 (make_pdf 함수 사용)
-                try:
-                    pdf_buf = make_pdf(doc_info)
+                if "pdf" in docs:
                     st.download_button(
                         "📄 PDF 파일 저장",
-                        data=pdf_buf.getvalue(),
+                        data=lambda d=docs["pdf"]: payload_store.get_bytes(d),
                         file_name=f"{base_name}.pdf",
                         mime="application/pdf",
                         key="download_pdf"
                     )
-                except Exception as e:
-                    st.error(f"PDF 생성 중 오류가 발생했습니다: {str(e)}")
+                else:
+                    st.error(f"PDF 생성 중 오류가 발생했습니다: {docs['pdf_error']}")
                     st.error("ReportLab 관련 오류일 수 있습니다. 필요한 라이브러리가 설치되었는지 확인해주세요.")
 
+        except SchedulerBusy:
+            # 대기열이 가득 찬 경우: 다른 사용자를 느리게 하지 않도록 바로 안내
+            ss.download_info = None
+            st.warning("지금은 확인서 생성 요청이 많습니다. 잠시 후 다시 다운로드 버튼을 눌러주세요.")
         except Exception as e:
             # 전체 문서 생성 오류 처리
             st.error(f"문서 생성 중 오류가 발생했습니다: {str(e)}")
-            st.error("필수 입력 항목을 다시 확인하거나 잠시 후 다시 시도해주세요.")
\ No newline at end of file
+            st.error("필수 입력 항목을 다시 확인하거나 잠시 후 다시 시도해주세요.")